@@ -5,28 +5,76 @@ This module provides HTTP endpoints for health checks, readiness checks,
 manual processing, and webhook handling.
 """
 
-import json
+import asyncio
 import logging
 import sys
 import os
+import orjson
 from datetime import datetime
 from aiohttp import web
 
 # Add shared directory to Python path
 # Handle both Docker environment (/app/shared) and development environment
 shared_path = '/app/shared' if os.path.exists('/app/shared') else os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))), 'shared')
-sys.path.insert(0, shared_path)
+if shared_path not in sys.path:  # Already present when PYTHONPATH is set or another module added it
+    sys.path.insert(0, shared_path)
 
 from shared.processing import DocumentProcessor
+from shared.utils.blob_url import parse_blob_url, blob_file_extension
+from shared.utils.clock import iso_now, iso_now_bytes
+# Same module path the processors raise from, so the except clauses match their classes
+from utils.exceptions import BlobNotFoundError, ProcessingSkippedError
 from shared.config.settings import (
     ALL_SUPPORTED_EXTENSIONS, CHUNK_MAX_TOKENS, EMBEDDING_MAX_TOKENS,
     ENCODING_MODEL, MAX_FILE_SIZE_MB, CONCURRENT_MESSAGE_PROCESSING,
     CONCURRENT_FILE_PROCESSING, MAX_RETRIES, RETRY_DELAY_SECONDS,
-    RATE_LIMIT_BASE_WAIT, RATE_LIMIT_MAX_WAIT, SERVICEBUS_NAMESPACE
+    RATE_LIMIT_BASE_WAIT, RATE_LIMIT_MAX_WAIT, SERVICEBUS_NAMESPACE, HTTP_MAX_REQUEST_BYTES
 )
 
 logger = logging.getLogger(__name__)
 
+# Event Grid marks its subscription handshake with this aeg-event-type header value
+_EVENT_GRID_VALIDATION_TYPE = 'SubscriptionValidation'
+
+
+def _json(data, status: int = 200) -> web.Response:
+    """
+    Build a JSON response serialized with orjson
+    
+    Args:
+        data: JSON-serializable response body
+        status: HTTP status code
+        
+    Returns:
+        web.Response: Response with an application/json body
+    """
+    return web.Response(body=orjson.dumps(data), status=status, content_type='application/json')
+
+
+async def _read_json_body(request):
+    """
+    Read and parse a JSON request body, rejecting oversized payloads up front
+    
+    Args:
+        request: Incoming aiohttp request
+        
+    Returns:
+        Tuple of (parsed body, None) on success or (None, error response) on failure
+    """
+    content_length = request.content_length
+    if content_length is not None and content_length > HTTP_MAX_REQUEST_BYTES:
+        return None, _json({'error': 'Payload too large'}, status=413)
+    
+    try:
+        raw = await request.read()
+    except web.HTTPRequestEntityTooLarge:
+        return None, _json({'error': 'Payload too large'}, status=413)
+    
+    try:
+        return orjson.loads(raw), None
+    except orjson.JSONDecodeError:
+        return None, _json({'error': 'Invalid JSON body'}, status=400)
+
 
 class APIHandlers:
     """
@@ -44,6 +92,57 @@ class APIHandlers:
             document_processor: Document processor instance
         """
         self.document_processor = document_processor
+        
+        # Webhook files are processed in the background, bounded like the Service Bus path.
+        # Tasks are keyed by (container, blob, eTag) so redelivered events for a blob version
+        # that is still being processed are not processed twice, while a new upload still runs.
+        self._processing_semaphore = asyncio.Semaphore(CONCURRENT_FILE_PROCESSING)
+        self._background_tasks: dict = {}
+        
+        # Everything in the health response except the timestamp is fixed configuration,
+        # so it is serialized once and the timestamp is spliced in per request
+        configuration = orjson.dumps({
+            'chunk_max_tokens': CHUNK_MAX_TOKENS,
+            'embedding_max_tokens': EMBEDDING_MAX_TOKENS,
+            'encoding_model': ENCODING_MODEL,
+            'max_file_size_mb': MAX_FILE_SIZE_MB,
+            'concurrent_message_processing': CONCURRENT_MESSAGE_PROCESSING,
+            'concurrent_file_processing': CONCURRENT_FILE_PROCESSING,
+            'max_retries': MAX_RETRIES,
+            'retry_delay_seconds': RETRY_DELAY_SECONDS,
+            'rate_limit_base_wait': RATE_LIMIT_BASE_WAIT,
+            'rate_limit_max_wait': RATE_LIMIT_MAX_WAIT
+        })
+        self._health_prefix = b'{"status":"healthy","timestamp":"'
+        self._health_suffix = b'","configuration":' + configuration + b'}'
+    
+    async def _process_in_background(self, blob_name: str, container_name: str):
+        """
+        Process a file accepted by the webhook once a processing slot is free
+        
+        Args:
+            blob_name: Name of the blob to process
+            container_name: Container containing the blob
+        """
+        async with self._processing_semaphore:
+            try:
+                await self.document_processor.process_file(blob_name, container_name)
+            except (BlobNotFoundError, ProcessingSkippedError):
+                # Expected outcomes, already logged by process_file
+                pass
+            except Exception:
+                # The webhook caller already has its 202, so this log is the only record of the failure
+                logger.exception(f"Background processing failed for {blob_name} from {container_name}")
+    
+    async def drain(self):
+        """
+        Wait for webhook files that are still being processed
+        
+        Called on shutdown after the server stops accepting requests.
+        """
+        if self._background_tasks:
+            logger.info(f"Waiting for {len(self._background_tasks)} webhook file(s) to finish processing")
+            await asyncio.gather(*self._background_tasks.values(), return_exceptions=True)
     
     async def health_check(self, request):
         """
@@ -52,22 +151,8 @@ class APIHandlers:
         Returns:
             JSON response with service health status and configuration
         """
-        return web.json_response({
-            'status': 'healthy', 
-            'timestamp': datetime.utcnow().isoformat(),
-            'configuration': {
-                'chunk_max_tokens': CHUNK_MAX_TOKENS,
-                'embedding_max_tokens': EMBEDDING_MAX_TOKENS,
-                'encoding_model': ENCODING_MODEL,
-                'max_file_size_mb': MAX_FILE_SIZE_MB,
-                'concurrent_message_processing': CONCURRENT_MESSAGE_PROCESSING,
-                'concurrent_file_processing': CONCURRENT_FILE_PROCESSING,
-                'max_retries': MAX_RETRIES,
-                'retry_delay_seconds': RETRY_DELAY_SECONDS,
-                'rate_limit_base_wait': RATE_LIMIT_BASE_WAIT,
-                'rate_limit_max_wait': RATE_LIMIT_MAX_WAIT
-            }
-        })
+        body = self._health_prefix + iso_now_bytes() + self._health_suffix
+        return web.Response(body=body, content_type='application/json')
 
     async def readiness_check(self, request):
         """
@@ -90,7 +175,7 @@ class APIHandlers:
                 servicebus_status = hasattr(self.document_processor, 'servicebus_client')
             
             if any(client is None for client in required_clients):
-                return web.json_response({
+                return _json({
                     'status': 'not ready', 
                     'message': 'Clients not initialized',
                     'clients': {
@@ -101,14 +186,26 @@ class APIHandlers:
                     }
                 }, status=503)
             
-            return web.json_response({
+            # Confirm each client can still authenticate; the checks run concurrently so
+            # readiness costs the slowest token refresh rather than their sum, and a
+            # cached token answers without any network call
+            client_names = ('blob_client', 'search_client', 'openai_client')
+            token_checks = await asyncio.gather(*(client.pre_warm_token() for client in required_clients))
+            if not all(token_checks):
+                return _json({
+                    'status': 'not ready',
+                    'message': 'Token acquisition failed',
+                    'clients': dict(zip(client_names, token_checks))
+                }, status=503)
+            
+            return _json({
                 'status': 'ready', 
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': iso_now(),
                 'clients_initialized': True,
                 'processing_mode': 'servicebus' if SERVICEBUS_NAMESPACE else 'webhook'
             })
         except Exception as e:
-            return web.json_response({'status': 'not ready', 'error': str(e)}, status=503)
+            return _json({'status': 'not ready', 'error': str(e)}, status=503)
 
     async def manual_process(self, request):
         """
@@ -119,83 +216,139 @@ class APIHandlers:
         Returns:
             JSON response with processing result
         """
+        request_data, error_response = await _read_json_body(request)
+        if error_response is not None:
+            return error_response
+        
         try:
-            request_data = await request.json()
             blob_name = request_data.get('blob_name')
             container_name = request_data.get('container_name')
             
             if not blob_name or not container_name:
-                return web.json_response({'error': 'blob_name and container_name are required'}, status=400)
+                return _json({'error': 'blob_name and container_name are required'}, status=400)
             
             await self.document_processor.process_file(blob_name, container_name)
             
-            return web.json_response({
+            return _json({
                 'status': 'success',
                 'message': f'Processed {blob_name} from {container_name}',
+                # Exact completion time rather than the per-second cached clock
                 'timestamp': datetime.utcnow().isoformat()
             })
             
         except Exception as e:
             logger.error(f"Manual processing failed: {e}")
-            return web.json_response({'status': 'error', 'error': str(e)}, status=500)
+            return _json({'status': 'error', 'error': str(e)}, status=500)
+
+    def _accept_event(self, event_data) -> tuple:
+        """
+        Validate one blob event and start processing its file in the background
+        
+        Args:
+            event_data: Event Grid event or direct call payload
+            
+        Returns:
+            Tuple of (response body, HTTP status) describing what happened to the event
+        """
+        # Reject malformed events individually, so one bad entry cannot fail a batch
+        # whose other events were already queued
+        if not isinstance(event_data, dict):
+            return {'error': 'Event must be a JSON object'}, 400
+        
+        # Extract blob information from Event Grid event or direct call
+        blob_url = ""
+        blob_name = None
+        container_name = None
+        etag = None
+        
+        event_payload = event_data.get('data')
+        if isinstance(event_payload, dict) and 'url' in event_payload:
+            # Event Grid event
+            blob_url = event_payload['url']
+            if not isinstance(blob_url, str):
+                return {'error': 'Invalid blob URL format'}, 400
+            if isinstance(event_payload.get('eTag'), str):
+                etag = event_payload['eTag']
+        elif 'blob_name' in event_data and 'container_name' in event_data:
+            # Direct call format
+            container_name = event_data['container_name']
+            blob_name = event_data['blob_name']
+            if not isinstance(container_name, str) or not isinstance(blob_name, str):
+                return {'error': 'blob_name and container_name must be strings'}, 400
+        
+        if blob_url:
+            # Parse blob URL to extract container and blob name
+            # URL format: https://storageaccount.blob.core.windows.net/container/blob
+            parsed_url = parse_blob_url(blob_url)
+            if not parsed_url:
+                return {'error': 'Invalid blob URL format'}, 400
+            container_name, blob_name = parsed_url
+        
+        if not blob_name or not container_name:
+            return {'error': 'blob_name and container_name are required'}, 400
+        
+        # Validate file type with the same extension rule the extractor dispatches on
+        file_extension = blob_file_extension(blob_name)
+        if file_extension not in ALL_SUPPORTED_EXTENSIONS:
+            logger.info(f"Skipping unsupported file type: {blob_name} (type: {file_extension})")
+            return {'status': 'skipped', 'reason': f'Unsupported file type: {file_extension}'}, 200
+        
+        # Event Grid retries and overlapping subscriptions deliver the same event more than once;
+        # the eTag tells those apart from an overwrite, which must be processed again
+        task_key = (container_name, blob_name, etag)
+        if task_key in self._background_tasks:
+            logger.info(f"Skipping duplicate event for {blob_name}: already being processed")
+            return {'status': 'skipped', 'reason': 'Already being processed'}, 200
+        
+        # Acknowledge immediately and process in the background, so Event Grid
+        # does not time out and redeliver while the pipeline runs
+        task = asyncio.create_task(self._process_in_background(blob_name, container_name))
+        self._background_tasks[task_key] = task
+        task.add_done_callback(lambda _: self._background_tasks.pop(task_key, None))
+        
+        return {'status': 'accepted', 'message': f'Queued {blob_name} from {container_name}'}, 202
 
     async def process_blob_event(self, request):
         """
         Handle blob creation events from HTTP webhook
         
+        Event Grid may batch several events into one request; every event is
+        dispatched, each file being processed concurrently in the background.
+        
         Returns:
-            JSON response with processing result
+            JSON response acknowledging the event (202) while the file is processed in the background,
+            or per-event results when the request carried several events
         """
+        data, error_response = await _read_json_body(request)
+        if error_response is not None:
+            return error_response
+        
         try:
-            data = await request.json()
-            logger.info(f"Received event: {data}")
+            # Answer the Event Grid subscription handshake before any event dispatch
+            if request.headers.get('aeg-event-type') == _EVENT_GRID_VALIDATION_TYPE:
+                validation_event = data[0] if isinstance(data, list) else data
+                logger.info("Answering Event Grid subscription validation")
+                return _json({'validationResponse': validation_event['data']['validationCode']})
             
-            # Parse event data - can handle both Event Grid and direct calls
-            if isinstance(data, list) and len(data) > 0:
-                # Event Grid sends array of events
-                event_data = data[0]
-            else:
-                # Direct call
-                event_data = data
+            if logger.isEnabledFor(logging.INFO):
+                # Avoid rendering the full event payload when INFO logging is off
+                logger.info(f"Received event: {data}")
             
-            # Extract blob information from Event Grid event or direct call
-            blob_url = ""
-            blob_name = None
-            container_name = None
+            # Event Grid sends an array of events; direct calls send a single object
+            events = data if isinstance(data, list) else [data]
+            if not events:
+                return _json({'error': 'No events in request'}, status=400)
             
-            if 'data' in event_data and 'url' in event_data['data']:
-                # Event Grid event
-                blob_url = event_data['data']['url']
-            elif 'blob_name' in event_data and 'container_name' in event_data:
-                # Direct call format
-                container_name = event_data['container_name']
-                blob_name = event_data['blob_name']
-            
-            if blob_url:
-                # Parse blob URL to extract container and blob name
-                # URL format: https://storageaccount.blob.core.windows.net/container/blob
-                url_parts = blob_url.replace('https://', '').split('/')
-                if len(url_parts) >= 3:
-                    container_name = url_parts[1]
-                    blob_name = '/'.join(url_parts[2:])
-                else:
-                    return web.json_response({'error': 'Invalid blob URL format'}, status=400)
-            
-            if not blob_name or not container_name:
-                return web.json_response({'error': 'blob_name and container_name are required'}, status=400)
-            
-            # Validate file type
-            file_extension = blob_name.lower().split('.')[-1] if '.' in blob_name else ''
-            
-            if file_extension not in ALL_SUPPORTED_EXTENSIONS:
-                logger.info(f"Skipping unsupported file type: {blob_name} (type: {file_extension})")
-                return web.json_response({'status': 'skipped', 'reason': f'Unsupported file type: {file_extension}'})
-            
-            # Process the file
-            await self.document_processor.process_file(blob_name, container_name)
+            if len(events) == 1:
+                body, status = self._accept_event(events[0])
+                return _json(body, status=status)
             
-            return web.json_response({'status': 'success', 'message': f'Processed {blob_name} from {container_name}'})
+            # Report per-event outcomes; the batch itself is acknowledged so Event Grid
+            # does not redeliver events that were already accepted
+            results = [self._accept_event(event_data)[0] for event_data in events]
+            accepted = sum(1 for result in results if result.get('status') == 'accepted')
+            return _json({'status': 'accepted', 'accepted_count': accepted, 'results': results}, status=202)
             
         except Exception as e:
             logger.error(f"Error processing event: {e}")
-            return web.json_response({'status': 'error', 'error': str(e)}, status=500)
+            return _json({'status': 'error', 'error': str(e)}, status=500)
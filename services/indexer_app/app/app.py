@@ -21,7 +21,8 @@ import os
 # Add the shared directory to the Python path
 # Handle both Docker environment (/app/shared) and development environment
 shared_path = '/app/shared' if os.path.exists('/app/shared') else os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'shared')
-sys.path.insert(0, shared_path)
+if shared_path not in sys.path:  # Already present when PYTHONPATH is set or another module added it
+    sys.path.insert(0, shared_path)
 
 # Configure logging
 logging.basicConfig(
@@ -55,9 +56,8 @@ if __name__ == '__main__':
     
     # Import and run the new main application
     try:
-        from main import main
-        import asyncio
-        asyncio.run(main())
+        from main import run
+        run()
     except ImportError as e:
         logger.error(f"Failed to import new main module: {e}")
         logger.error("Please ensure all dependencies are installed and modules are properly structured")
@@ -15,23 +15,31 @@ Features:
 
 import asyncio
 import logging
+import signal
 import sys
 import os
 from aiohttp import web
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows; use the default asyncio loop
+    uvloop = None
+
 # Add shared directory to Python path
 # Handle both Docker environment (/app/shared) and development environment
 shared_path = '/app/shared' if os.path.exists('/app/shared') else os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'shared')
-sys.path.insert(0, shared_path)
+if shared_path not in sys.path:  # Already present when PYTHONPATH is set or another module added it
+    sys.path.insert(0, shared_path)
 
 from shared.config.settings import (
-    HTTP_HOST, HTTP_PORT, HTTP_LOCALHOST, SERVICEBUS_NAMESPACE,
-    MAIN_LOOP_SLEEP_SECONDS, CHUNK_MAX_TOKENS, EMBEDDING_MAX_TOKENS,
+    HTTP_HOST, HTTP_PORT, HTTP_LOCALHOST, HTTP_MAX_REQUEST_BYTES, SERVICEBUS_NAMESPACE,
+    CHUNK_MAX_TOKENS, EMBEDDING_MAX_TOKENS,
     MAX_FILE_SIZE_MB, CONCURRENT_MESSAGE_PROCESSING, CONCURRENT_FILE_PROCESSING,
-    MAX_RETRIES
+    MAX_RETRIES, ERROR_RETRY_SLEEP_SECONDS
 )
 from shared.processing import DocumentProcessor
 from shared.services import ServiceBusProcessor
+from azure_clients import close_session, close_credential
 from api import APIHandlers
 
 # Configure logging
@@ -52,13 +60,16 @@ def create_app(api_handlers: APIHandlers) -> web.Application:
     Returns:
         web.Application: Configured aiohttp application
     """
-    app = web.Application()
+    # Bodies without a Content-Length are capped here while they are read
+    app = web.Application(client_max_size=HTTP_MAX_REQUEST_BYTES)
     
     # Add routes
-    app.router.add_get('/health', api_handlers.health_check)
-    app.router.add_get('/ready', api_handlers.readiness_check)
-    app.router.add_post('/process', api_handlers.manual_process)
-    app.router.add_post('/webhook', api_handlers.process_blob_event)  # Event Grid webhook
+    app.add_routes([
+        web.get('/health', api_handlers.health_check),
+        web.get('/ready', api_handlers.readiness_check),
+        web.post('/process', api_handlers.manual_process),
+        web.post('/webhook', api_handlers.process_blob_event),  # Event Grid webhook
+    ])
     
     return app
 
@@ -79,9 +90,15 @@ async def main():
                f"CONCURRENT_FILE_PROCESSING={CONCURRENT_FILE_PROCESSING}, "
                f"MAX_RETRIES={MAX_RETRIES}")
     
-    # Initialize the document processor
+    # Initialize the document processor and, if configured, the Service Bus processor.
+    # Their client setup and token acquisition are independent, so run them concurrently.
     document_processor = DocumentProcessor()
-    await document_processor.initialize()
+    servicebus_processor = ServiceBusProcessor(document_processor) if SERVICEBUS_NAMESPACE else None
+    
+    initializers = [document_processor.initialize()]
+    if servicebus_processor:
+        initializers.append(servicebus_processor.initialize())
+    await asyncio.gather(*initializers)
     
     # Initialize API handlers
     api_handlers = APIHandlers(document_processor)
@@ -89,40 +106,73 @@ async def main():
     # Create the web application
     app = create_app(api_handlers)
     
-    # Start the web server
-    runner = web.AppRunner(app)
+    # Start the web server; no access log, since probes hit /health and /ready every few seconds
+    runner = web.AppRunner(app, access_log=None)
     await runner.setup()
     
     site = web.TCPSite(runner, HTTP_HOST, HTTP_PORT)
     await site.start()
     
-    logger.info(f"Server started on port {HTTP_PORT}")
-    logger.info(f"Health check: http://{HTTP_LOCALHOST}:{HTTP_PORT}/health")
-    logger.info(f"Ready check: http://{HTTP_LOCALHOST}:{HTTP_PORT}/ready")
-    logger.info(f"Process endpoint: http://{HTTP_LOCALHOST}:{HTTP_PORT}/process")
-    logger.info(f"Webhook endpoint: http://{HTTP_LOCALHOST}:{HTTP_PORT}/webhook")
+    base_url = f"http://{HTTP_LOCALHOST}:{HTTP_PORT}"
+    logger.info(
+        f"Server started on port {HTTP_PORT}\n"
+        f"Health check: {base_url}/health\n"
+        f"Ready check: {base_url}/ready\n"
+        f"Process endpoint: {base_url}/process\n"
+        f"Webhook endpoint: {base_url}/webhook"
+    )
     
-    # Initialize and start Service Bus processing if configured
+    # Start Service Bus processing if configured
     servicebus_task = None
-    servicebus_processor = None
     
-    if SERVICEBUS_NAMESPACE:
+    if servicebus_processor:
         logger.info(f"Starting Service Bus processing for namespace: {SERVICEBUS_NAMESPACE}")
-        servicebus_processor = ServiceBusProcessor(document_processor)
-        await servicebus_processor.initialize()
         servicebus_task = asyncio.create_task(servicebus_processor.start_processing())
     else:
         logger.info("Service Bus not configured - using webhook mode only")
     
     logger.info("File Processor microservice started successfully")
     
-    # Keep the server running
+    # Keep the server running until a shutdown signal arrives
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Signal handlers are not supported on Windows event loops; rely on KeyboardInterrupt
+            pass
+    
+    stop_task = asyncio.create_task(stop_event.wait())
+    
     try:
+        # Supervise the Service Bus task: wake up only on shutdown or if it exits unexpectedly
         while True:
-            await asyncio.sleep(MAIN_LOOP_SLEEP_SECONDS)  # Sleep for 1 hour
+            supervised = {stop_task, servicebus_task} if servicebus_task else {stop_task}
+            done, _ = await asyncio.wait(supervised, return_when=asyncio.FIRST_COMPLETED)
+            if stop_task in done:
+                break
+            
+            if servicebus_task.cancelled():
+                logger.error("Service Bus processing task was cancelled unexpectedly")
+            elif servicebus_task.exception():
+                logger.error(f"Service Bus processing task failed: {servicebus_task.exception()}")
+            else:
+                logger.error("Service Bus processing task exited unexpectedly")
+            
+            # Back off briefly, unless shutdown is requested meanwhile, then restart
+            await asyncio.wait({stop_task}, timeout=ERROR_RETRY_SLEEP_SECONDS)
+            if stop_task.done():
+                break
+            logger.info("Restarting Service Bus processing...")
+            servicebus_task = asyncio.create_task(servicebus_processor.start_processing())
+        
+        logger.info("Shutting down server...")
     except KeyboardInterrupt:
         logger.info("Shutting down server...")
     finally:
+        stop_task.cancel()
+        
         # Clean shutdown
         if servicebus_processor and servicebus_task:
             await servicebus_processor.stop_processing()
@@ -133,9 +183,22 @@ async def main():
                 pass
         
         await runner.cleanup()
+        await api_handlers.drain()
+        await close_session()
+        await close_credential()
+
+
+def run():
+    """
+    Run the microservice on uvloop when it is installed, otherwise on the default event loop
+    """
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
 
 
 if __name__ == '__main__':
     # Start the aiohttp application
     logger.info(f"Starting File Processor microservice on port {HTTP_PORT}")
-    asyncio.run(main())
+    run()
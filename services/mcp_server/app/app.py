@@ -1,27 +1,41 @@
 import asyncio
+import functools
 import logging
 import os
 import sys
-import json
-from typing import Optional, Dict, List
+import orjson
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Dict, List, Tuple
 
 import uvicorn
 from fastmcp import FastMCP
 from fastmcp.server.dependencies import get_http_headers
 from fastmcp import Context
-from starlette.responses import JSONResponse
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows; use the default asyncio loop
+    uvloop = None
 
 from azure_clients.search_client import DirectSearchClient
 from azure_clients.openai_client import DirectOpenAIClient
-from azure_clients.auth import create_credential
+from azure_clients.auth import create_credential, close_credential
+from azure_clients.http_session import close_session
 from auth.jwt_validator import validate_bearer_token
+from utils.semantic_cache import SemanticCache
 
 from config.settings import (
     SEARCH_SERVICE_NAME, SEARCH_INDEX_NAME, AZURE_SEARCH_SCOPE, SEARCH_ENDPOINT_SUFFIX,
     AZURE_TENANT_ID, MCP_SERVER_NAME, MCP_SERVER_VERSION,
-    SEARCH_DEFAULT_TOP, SEARCH_MAX_TOP, SEARCH_ALL_DOCS_MAX, EXCLUDED_FIELDS, MCP_PORT,
+    SEARCH_DEFAULT_TOP, SEARCH_MAX_TOP, SEARCH_ALL_DOCS_MAX, EXCLUDED_FIELDS, MCP_PORT, MCP_GZIP_MINIMUM_SIZE,
+    MCP_EMBEDDING_CACHE_SIZE, MCP_EMBEDDING_BATCH_SIZE, MCP_EMBEDDING_BATCH_WINDOW_MS,
+    MCP_SEMANTIC_CACHE_SIZE, MCP_SEMANTIC_CACHE_TTL_SECONDS, MCP_SEMANTIC_CACHE_THRESHOLD, MCP_MAX_INFLIGHT_SEARCHES,
+    MCP_BATCH_SEARCH_MAX_QUERIES,
     OPENAI_SERVICE_NAME, AZURE_COGNITIVE_SCOPE,
-    OPENAI_ENDPOINT_BASE, OPENAI_EMBEDDING_MODEL
+    OPENAI_ENDPOINT_BASE, OPENAI_EMBEDDING_MODEL, TOKEN_PRE_WARMING_ENABLED,
+    DOCUMENT_ID_FIELD, DOCUMENT_CONTENT_FIELD, DOCUMENT_VECTOR_FIELD
 )
 
 # ────────────────────────── Logging
@@ -35,8 +49,45 @@ mcp = FastMCP(name=MCP_SERVER_NAME)
 search_client: Optional[DirectSearchClient] = None
 openai_client: Optional[DirectOpenAIClient] = None
 
+# ────────────────────────── Query Embedding Cache
+# LRU of query embeddings, plus in-flight requests so identical concurrent queries share one call
+embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+embedding_inflight: Dict[str, asyncio.Future] = {}
+
+# Queries waiting to be embedded; a background batcher coalesces them into one OpenAI call
+embedding_queue: "asyncio.Queue[Tuple[str, asyncio.Future]]" = asyncio.Queue()
+embedding_batcher: Optional[asyncio.Task] = None
+
+# ────────────────────────── Semantic Result Cache
+# Vector and hybrid results reused for paraphrased queries whose embeddings nearly match
+semantic_cache = SemanticCache(
+    maxsize=MCP_SEMANTIC_CACHE_SIZE,
+    ttl=MCP_SEMANTIC_CACHE_TTL_SECONDS,
+    threshold=MCP_SEMANTIC_CACHE_THRESHOLD
+)
+
+# ────────────────────────── Search Concurrency
+# Caps queries in flight to Azure Search so bursts queue here instead of being throttled
+search_semaphore = asyncio.Semaphore(MCP_MAX_INFLIGHT_SEARCHES)
+# Searches in flight, so identical concurrent searches share one request
+search_inflight: Dict[tuple, asyncio.Future] = {}
+
+
+# ────────────────────────── Field Projection
+# Excluded fields are dropped by the search service via select rather than stripped from
+# every returned document; this is the default projection when the caller picks no fields
+DEFAULT_SELECT_FIELDS = [
+    field for field in (DOCUMENT_ID_FIELD, DOCUMENT_CONTENT_FIELD, DOCUMENT_VECTOR_FIELD)
+    if field not in EXCLUDED_FIELDS
+]
+
 
 # ────────────────────────── Helpers
+@functools.lru_cache(maxsize=2048)
+def build_filter_query(filter_items: Tuple[Tuple[str, str], ...]) -> str:
+    """Join sorted (field, expression) pairs into one OData filter, memoized for recurring filter sets."""
+    return " and ".join(f"{k} {v}" for k, v in filter_items)
+
 def get_bearer_token() -> str:
     headers = get_http_headers()
     return headers.get("authorization", "")
@@ -53,7 +104,7 @@ async def initialize_search_client():
         )
 
 async def initialize_openai_client():
-    global openai_client
+    global openai_client, embedding_batcher
     if not openai_client:
         credential = create_credential()
         openai_client = DirectOpenAIClient(
@@ -61,6 +112,195 @@ async def initialize_openai_client():
             credential=credential,
             scope=AZURE_COGNITIVE_SCOPE
         )
+    if embedding_batcher is None or embedding_batcher.done():
+        embedding_batcher = asyncio.create_task(run_embedding_batcher())
+
+async def run_embedding_batcher():
+    """Embed queued queries in batches, waiting briefly after the first one for more to arrive."""
+    loop = asyncio.get_running_loop()
+    window = MCP_EMBEDDING_BATCH_WINDOW_MS / 1000
+    while True:
+        batch = [await embedding_queue.get()]
+        deadline = loop.time() + window
+        while len(batch) < MCP_EMBEDDING_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(embedding_queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        # Skip queries whose callers have already given up
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            continue
+        try:
+            embeddings = await openai_client.create_embeddings_batch(
+                [text for text, _ in batch], OPENAI_EMBEDDING_MODEL
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+async def embed_query(query: str) -> List[float]:
+    """Queue a query for the batcher and wait for its embedding."""
+    future = asyncio.get_running_loop().create_future()
+    await embedding_queue.put((query, future))
+    return await future
+
+def join_inflight(inflight: Dict, key, start: Callable[[], Awaitable]) -> asyncio.Future:
+    """
+    Return the task already running for key, or start one with start().
+
+    The work runs in its own task, so a caller that is cancelled only stops
+    waiting; the other callers sharing the task still get its result.
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(start())
+        inflight[key] = task
+
+        def release(done: asyncio.Future):
+            if inflight.get(key) is done:
+                del inflight[key]
+            if not done.cancelled():
+                done.exception()  # Mark retrieved in case every caller stopped waiting
+
+        task.add_done_callback(release)
+    return task
+
+async def embed_and_cache(query: str, key: str) -> List[float]:
+    """Embed a query and store the result in the LRU cache."""
+    embedding = await embed_query(query)
+    embedding_cache[key] = embedding
+    if len(embedding_cache) > MCP_EMBEDDING_CACHE_SIZE:
+        embedding_cache.popitem(last=False)
+    return embedding
+
+async def get_query_embedding(query: str) -> List[float]:
+    """Get the embedding for a search query, reusing cached and in-flight results."""
+    key = query.strip().lower()
+    embedding = embedding_cache.get(key)
+    if embedding is not None:
+        embedding_cache.move_to_end(key)
+        return embedding
+
+    return await asyncio.shield(join_inflight(embedding_inflight, key, lambda: embed_and_cache(query, key)))
+
+# ────────────────────────── Search
+async def dispatch_search(
+    search_type: str,
+    query: Optional[str],
+    embeddings: Optional[List[float]],
+    top: int,
+    select: List[str],
+    filter_query: Optional[str]
+):
+    """Send one text, vector or hybrid query to Azure Search."""
+    if search_type == "text":
+        return await search_client.search_text(
+            search_text=query or "*",
+            top=top,
+            select=select,
+            filter_query=filter_query
+        )
+    if search_type == "vector":
+        return await search_client.search_vector(
+            vector=embeddings,
+            top=top,
+            select=select,
+            filter_query=filter_query
+        )
+    return await search_client.search_hybrid(
+        search_text=query,
+        vector=embeddings,
+        top=top,
+        select=select,
+        filter_query=filter_query
+    )
+
+
+async def shared_search(
+    search_type: str,
+    query: Optional[str],
+    embeddings: Optional[List[float]],
+    top: int,
+    select: List[str],
+    filter_query: Optional[str]
+):
+    """Run a search within the concurrency limit, joining an identical search already in flight."""
+    async def limited_search():
+        if search_semaphore.locked():
+            logger.info(f"   Search concurrency limit ({MCP_MAX_INFLIGHT_SEARCHES}) reached; queueing {search_type} query")
+        async with search_semaphore:
+            return await dispatch_search(search_type, query, embeddings, top, select, filter_query)
+
+    key = (search_type, query, filter_query, top, tuple(select))
+    return await asyncio.shield(join_inflight(search_inflight, key, limited_search))
+
+
+async def run_search(
+    query: Optional[str],
+    filters: Optional[Dict[str, str]],
+    top: Optional[int],
+    select_fields: Optional[List[str]],
+    search_type: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Run one search and build its response payload.
+
+    Raises:
+        ValueError: With the message returned to the caller when the search cannot be run
+    """
+    if search_type in ("vector", "hybrid"):
+        if not query:
+            raise ValueError("Error: 'query' is required for vector or hybrid search")
+        await initialize_openai_client()
+        try:
+            embeddings = await get_query_embedding(query)
+        except Exception as e:
+            raise ValueError(f"Embedding error: {str(e)}")
+    else:
+        embeddings = None
+
+    # Sorted so the same filters always yield the same string, and the same cache keys downstream
+    filter_query = build_filter_query(tuple(sorted((k, str(v)) for k, v in filters.items()))) if filters else None
+    top = min(top or SEARCH_DEFAULT_TOP, SEARCH_MAX_TOP)
+    select = [field for field in select_fields if field not in EXCLUDED_FIELDS] if select_fields else None
+    select = select or DEFAULT_SELECT_FIELDS
+
+    # Only results for the same search shape may answer a similar query
+    cache_namespace = (search_type, filter_query, top, tuple(select))
+    cached_result = semantic_cache.get(cache_namespace, embeddings) if embeddings else None
+
+    if cached_result is not None:
+        logger.info(f"   Semantic cache hit for {search_type} query")
+        result = cached_result
+    elif search_type not in ("text", "vector", "hybrid"):
+        raise ValueError(f"Invalid search_type: {search_type}")
+    else:
+        try:
+            result = await shared_search(search_type, query, embeddings, top, select, filter_query)
+        except Exception as e:
+            raise ValueError(f"Search failed: {str(e)}")
+
+    if embeddings and cached_result is None:
+        semantic_cache.set(cache_namespace, embeddings, result)
+
+    return {
+        "total_count": result.count,
+        "returned_count": len(result.documents),
+        "documents": result.documents,
+        "query": query,
+        "search_type": search_type
+    }
+
 
 # ────────────────────────── Tool
 @mcp.tool()
@@ -82,57 +322,75 @@ async def azure_search(
 
     await initialize_search_client()
 
-    if search_type in ("vector", "hybrid"):
-        if not query:
-            return "Error: 'query' is required for vector or hybrid search"
-        await initialize_openai_client()
-        try:
-            embeddings = await openai_client.create_embeddings(query, OPENAI_EMBEDDING_MODEL)
-        except Exception as e:
-            return f"Embedding error: {str(e)}"
-    else:
-        embeddings = None
+    try:
+        response = await run_search(query, filters, top, select_fields, search_type)
+    except ValueError as e:
+        return str(e)
+
+    response["user"] = user_info.get("username", "unknown")
+    # Compact output: indentation only inflates what the model has to read
+    return orjson.dumps(response, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
 
-    filter_query = " and ".join(f"{k} {v}" for k, v in filters.items()) if filters else None
-    top = min(top or SEARCH_DEFAULT_TOP, SEARCH_MAX_TOP)
 
+@mcp.tool()
+async def batch_search(
+    queries: List[Dict[str, Any]],
+    dedup: Optional[bool] = False,
+    ctx: Context = None
+) -> str:
+    """
+    Run several searches concurrently in one call.
+
+    Each query takes the azure_search parameters (query, filters, top, select_fields,
+    search_type). The token is validated once, the searches run concurrently, and
+    concurrent vector/hybrid queries share batched embedding calls. With dedup, a
+    document already returned for an earlier query is dropped from later results.
+    """
+    auth = get_bearer_token()
+    if not auth:
+        return "Error: Missing Authorization header"
     try:
-        if search_type == "text":
-            result = await search_client.search_text(
-                search_text=query or "*",
-                top=top,
-                select=select_fields,
-                filter_query=filter_query
-            )
-        elif search_type == "vector":
-            result = await search_client.search_vector(
-                vector=embeddings,
-                top=top,
-                select=select_fields,
-                filter_query=filter_query
-            )
-        elif search_type == "hybrid":
-            result = await search_client.search_hybrid(
-                search_text=query,
-                vector=embeddings,
-                top=top,
-                select=select_fields,
-                filter_query=filter_query
-            )
-        else:
-            return f"Invalid search_type: {search_type}"
+        user_info = validate_bearer_token(auth, AZURE_TENANT_ID)
     except Exception as e:
-        return f"Search failed: {str(e)}"
+        return f"Authentication failed: {str(e)}"
+    if not queries:
+        return "Error: 'queries' must contain at least one search"
+    if len(queries) > MCP_BATCH_SEARCH_MAX_QUERIES:
+        return f"Error: 'queries' can contain at most {MCP_BATCH_SEARCH_MAX_QUERIES} searches"
+    if not all(isinstance(spec, dict) for spec in queries):
+        return "Error: each entry in 'queries' must be an object of search parameters"
 
-    docs = [{k: v for k, v in doc.items() if k not in EXCLUDED_FIELDS} for doc in result.documents]
-    return json.dumps({
-        "total_count": result.count,
-        "returned_count": len(docs),
-        "documents": docs,
-        "query": query,
-        "user": user_info.get("username", "unknown"),
-        "search_type": search_type
-    }, indent=2, default=str)
+    await initialize_search_client()
+
+    outcomes = await asyncio.gather(*(
+        run_search(
+            spec.get("query"),
+            spec.get("filters"),
+            spec.get("top", SEARCH_DEFAULT_TOP),
+            spec.get("select_fields"),
+            spec.get("search_type", "text")
+        )
+        for spec in queries
+    ), return_exceptions=True)
+
+    results = []
+    seen_ids = set()
+    for outcome in outcomes:
+        # BaseException, so a cancelled search is reported rather than failing the whole batch
+        if isinstance(outcome, BaseException):
+            results.append({"error": str(outcome)})
+            continue
+        if dedup:
+            documents = [doc for doc in outcome["documents"] if doc.get(DOCUMENT_ID_FIELD) not in seen_ids]
+            seen_ids.update(doc.get(DOCUMENT_ID_FIELD) for doc in documents)
+            outcome["documents"] = documents
+            outcome["returned_count"] = len(documents)
+        results.append(outcome)
+
+    return orjson.dumps({
+        "results": results,
+        "user": user_info.get("username", "unknown")
+    }, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
 
 
 @mcp.tool()
@@ -157,60 +415,135 @@ async def get_all_docs(
 
     try:
         # Perform a wildcard search to get all documents, selecting only the ID field
-        result = await search_client.search_text(
-            search_text="*",  # Wildcard to match all documents
-            top=top,
-            select=["id"],  # Only return the ID field
-            filter_query=None
-        )
+        async with search_semaphore:
+            result = await search_client.search_text(
+                search_text="*",  # Wildcard to match all documents
+                top=top,
+                select=["id"],  # Only return the ID field
+                filter_query=None
+            )
     except Exception as e:
         return f"Search failed: {str(e)}"
 
     # Extract only the IDs from the results
     document_ids = [doc.get("id") for doc in result.documents if doc.get("id")]
 
-    return json.dumps({
+    return orjson.dumps({
         "total_count": result.count,
         "returned_count": len(document_ids),
         "document_ids": document_ids,
         "user": user_info.get("username", "unknown"),
         "max_requested": top
-    }, indent=2, default=str)
+    }, default=str).decode()
 
 
 # ────────────────────────── Health Endpoint
-@mcp.custom_route("/health", methods=["GET"])
-async def health(request):
-    auth = get_bearer_token()
-    if not auth:
-        return "Error: Missing Authorization header"
-    try:
-        validate_bearer_token(auth, AZURE_TENANT_ID)
-    except Exception as e:
-        return f"Authentication failed: {str(e)}"
-    
-    return JSONResponse({
-        "status": "healthy",
-        "version": MCP_SERVER_VERSION,
-        "search_configured": bool(SEARCH_SERVICE_NAME),
-        "openai_enabled": bool(OPENAI_SERVICE_NAME),
-        "transport": "http",
-        "available_tools": ["azure_search", "get_all_docs"],
-        "max_all_docs": SEARCH_ALL_DOCS_MAX
-    })
+# The health payload only depends on startup configuration, so it is serialized once
+HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "version": MCP_SERVER_VERSION,
+    "search_configured": bool(SEARCH_SERVICE_NAME),
+    "openai_enabled": bool(OPENAI_SERVICE_NAME),
+    "transport": "http",
+    "available_tools": ["azure_search", "batch_search", "get_all_docs"],
+    "max_all_docs": SEARCH_ALL_DOCS_MAX
+})
+
+
+def json_headers(body: bytes, extra_headers: Optional[List[tuple]] = None) -> List[tuple]:
+    """Build the raw ASGI header list for a JSON body."""
+    return [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())] + (extra_headers or [])
+
+
+async def send_json(send, status: int, body: bytes, headers: Optional[List[tuple]] = None):
+    """Send a complete JSON response over a raw ASGI channel, reusing prebuilt headers when given."""
+    await send({"type": "http.response.start", "status": status, "headers": headers or json_headers(body)})
+    await send({"type": "http.response.body", "body": body})
+
+
+# Fixed responses are built once, headers included; only authentication failures vary per request
+HEALTH_HEADERS = json_headers(HEALTH_BODY)
+METHOD_NOT_ALLOWED_BODY = b'{"error":"Method not allowed"}'
+METHOD_NOT_ALLOWED_HEADERS = json_headers(METHOD_NOT_ALLOWED_BODY, [(b"allow", b"GET")])
+MISSING_AUTH_BODY = b'{"error":"Missing Authorization header"}'
+MISSING_AUTH_HEADERS = json_headers(MISSING_AUTH_BODY)
+
+
+class HealthCheckInterceptor:
+    """
+    Pure ASGI middleware that answers /health before routing and the other middleware run.
+
+    Probes hit this endpoint continuously; the response is the precomputed
+    HEALTH_BODY, still behind bearer token validation.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != "/health":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] != "GET":
+            await send_json(send, 405, METHOD_NOT_ALLOWED_BODY, METHOD_NOT_ALLOWED_HEADERS)
+            return
+
+        auth = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"authorization"), "")
+        if not auth:
+            await send_json(send, 401, MISSING_AUTH_BODY, MISSING_AUTH_HEADERS)
+            return
+        try:
+            validate_bearer_token(auth, AZURE_TENANT_ID)
+        except Exception as e:
+            await send_json(send, 401, orjson.dumps({"error": f"Authentication failed: {str(e)}"}))
+            return
+
+        await send_json(send, 200, HEALTH_BODY, HEALTH_HEADERS)
+
+
+async def prewarm_clients():
+    """Create the Azure clients and acquire their tokens before the first request arrives."""
+    await initialize_search_client()
+    clients = [search_client]
+    if OPENAI_SERVICE_NAME:
+        await initialize_openai_client()
+        clients.append(openai_client)
+
+    if TOKEN_PRE_WARMING_ENABLED:
+        results = await asyncio.gather(*(client.pre_warm_token() for client in clients))
+        logger.info(f"Pre-warmed {sum(results)}/{len(clients)} client tokens")
 
 
 # ────────────────────────── Entry Point
 async def main():
     logger.info(f"Starting MCP Server: {MCP_SERVER_NAME} (v{MCP_SERVER_VERSION})")
-    await mcp.run_async(
-        transport="http",
-        host="0.0.0.0",
-        port=MCP_PORT,
-        path="/mcp",
-        log_level="info"
-    )
+    try:
+        await prewarm_clients()
+        await mcp.run_async(
+            transport="http",
+            host="0.0.0.0",
+            port=MCP_PORT,
+            path="/mcp",
+            log_level="info",
+            # C HTTP parser for the many small tool calls; the streamable HTTP transport needs no websockets
+            uvicorn_config={"http": "httptools", "ws": "none"},
+            middleware=[
+                # Outermost, so health probes skip the rest of the stack
+                Middleware(HealthCheckInterceptor),
+                # Search results carry large content fields; compress them for clients that accept gzip
+                Middleware(GZipMiddleware, minimum_size=MCP_GZIP_MINIMUM_SIZE)
+            ]
+        )
+    finally:
+        if embedding_batcher is not None:
+            embedding_batcher.cancel()
+        await close_session()
+        await close_credential()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -1,8 +1,43 @@
 """
 Simple JWT validator that just decodes tokens without signature verification
 """
-import jwt
-from typing import Dict, Any
+import orjson
+import time
+import base64
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+
+# LRU of validated claims keyed by a hash of the raw token, each valid until the token's exp
+_CLAIMS_CACHE_MAX_ENTRIES = 1024
+_claims_cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+def _decode_payload(token: str) -> Dict[str, Any]:
+    """
+    Decode the claims segment of a JWT without verifying it
+    
+    Splits the token once and parses only the payload; the header is not
+    needed since the signature is not checked.
+    
+    Args:
+        token: Raw JWT (header.payload.signature)
+        
+    Returns:
+        Dict[str, Any]: Token claims
+        
+    Raises:
+        ValueError: If the token is malformed
+    """
+    segments = token.split('.', 2)
+    if len(segments) != 3:
+        raise ValueError("Not enough segments")
+    
+    payload_segment = segments[1]
+    payload = orjson.loads(base64.urlsafe_b64decode(payload_segment + '=' * (-len(payload_segment) % 4)))
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid payload string: must be a json object")
+    return payload
+
 
 class AzureTokenValidator:
     """
@@ -49,17 +84,27 @@ def validate_bearer_token(authorization_header: str, expected_tenant_id: str) ->
         
     token = authorization_header[7:]  # Remove "Bearer " prefix
     
+    # Repeat requests with the same token skip the decode; the tenant is part of the key
+    cache_key = hashlib.blake2b(f"{expected_tenant_id}|{token}".encode(), digest_size=16).digest()
+    cached = _claims_cache.get(cache_key)
+    now = time.time()
+    if cached is not None:
+        expires_at, user_info = cached
+        if now < expires_at:
+            _claims_cache.move_to_end(cache_key)
+            return user_info
+        del _claims_cache[cache_key]
+    
     try:
         # Decode without verification to get payload
-        payload = jwt.decode(token, options={"verify_signature": False})
+        payload = _decode_payload(token)
         
         # Extract tenant ID from token and validate
         token_tenant = payload.get('tid')
         if token_tenant != expected_tenant_id:
             raise ValueError(f"Token tenant {token_tenant} doesn't match expected {expected_tenant_id}")
         
-        # Return user info
-        return {
+        user_info = {
             'user_id': payload.get('oid'),
             'username': payload.get('unique_name') or payload.get('upn') or payload.get('preferred_username'),
             'tenant_id': payload.get('tid'),
@@ -67,3 +112,14 @@ def validate_bearer_token(authorization_header: str, expected_tenant_id: str) ->
         }
     except Exception as e:
         raise ValueError(f"Token decode failed: {e}")
+    
+    # Only cache tokens that carry an expiry still in the future
+    expires_at = payload.get('exp')
+    if isinstance(expires_at, (int, float)) and expires_at > now:
+        _claims_cache[cache_key] = (expires_at, user_info)
+        # Evict least recently used tokens so active callers keep their entries
+        while len(_claims_cache) > _CLAIMS_CACHE_MAX_ENTRIES:
+            _claims_cache.popitem(last=False)
+    
+    # Return user info
+    return user_info
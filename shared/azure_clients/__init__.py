@@ -4,7 +4,8 @@ Azure clients package
 This package provides Azure service clients with managed identity authentication.
 """
 
-from .auth import AzureClientBase, create_credential
+from .auth import AzureClientBase, create_credential, close_credential
+from .http_session import get_session, close_session
 from .openai_client import DirectOpenAIClient
 from .search_client import DirectSearchClient
 from .blob_client import DirectBlobClient
@@ -9,23 +9,32 @@ import logging
 import threading
 import pytz
 import asyncio
+import aiohttp
+import orjson
 from datetime import datetime, timezone, timedelta
-from threading import Lock
-from typing import Optional
+from typing import Any, Collection, Optional
 
+from azure.core.credentials import AccessToken
 from azure.identity.aio import DefaultAzureCredential
 
 from utils.exceptions import TokenAcquisitionError
+from azure_clients.http_session import get_session
 
 from config.settings import (
-    TOKEN_LF, TOKEN_PREVIEW_LENGTH, DEFAULT_TIMEZONE, TOKEN_ACQUISITION_TIMEOUT_SECONDS,
-    HTTP_CONTENT_TYPE_JSON, HTTP_AUTH_BEARER_PREFIX, AZURE_CLIENT_ID, VERBOSE_AUTH_LOGGING
+    TOKEN_LF, TOKEN_REFRESH_MARGIN_SECONDS, TOKEN_PREVIEW_LENGTH, DEFAULT_TIMEZONE, TOKEN_ACQUISITION_TIMEOUT_SECONDS,
+    HTTP_CONTENT_TYPE_JSON, HTTP_AUTH_BEARER_PREFIX, AZURE_CLIENT_ID, VERBOSE_AUTH_LOGGING,
+    HTTP_SUCCESS_CODES
 )
 
 logger = logging.getLogger(__name__)
 
+_credential: Optional[DefaultAzureCredential] = None
 
-async def get_token_async(credential, scope: str) -> Optional[str]:
+# Resolved once; only used to render token expiry times in verbose auth logs
+_LOG_TIMEZONE = pytz.timezone(DEFAULT_TIMEZONE)
+
+
+async def get_token_async(credential, scope: str) -> AccessToken:
     """
     Get Azure access token using DefaultAzureCredential with timeout protection
     
@@ -34,7 +43,10 @@ async def get_token_async(credential, scope: str) -> Optional[str]:
         scope: The token scope to request
         
     Returns:
-        Optional[str]: Access token or None if failed
+        AccessToken: Access token and its expiry (epoch seconds)
+        
+    Raises:
+        TokenAcquisitionError: If the token could not be acquired
     """
     try:
         if VERBOSE_AUTH_LOGGING:
@@ -50,7 +62,7 @@ async def get_token_async(credential, scope: str) -> Optional[str]:
             if VERBOSE_AUTH_LOGGING:
                 logger.info(f"   Token acquired successfully - Expires: {datetime.fromtimestamp(token.expires_on, tz=timezone.utc)}")
                 logger.info(f"   Token preview: {token.token[:TOKEN_PREVIEW_LENGTH]}...")
-            return token.token
+            return token
             
         except asyncio.TimeoutError:
             logger.error(f"   Token acquisition timed out after {TOKEN_ACQUISITION_TIMEOUT_SECONDS} seconds for scope {scope}")
@@ -63,59 +75,79 @@ async def get_token_async(credential, scope: str) -> Optional[str]:
 
 class AzureClientBase:
     """
-    Base class for managing Azure token-based authentication with thread-safe token refresh.
+    Base class for managing Azure token-based authentication with concurrency-safe token refresh.
     
     This class provides common functionality for Azure clients that need to manage
-    access tokens with automatic refresh and thread-safe caching.
+    access tokens with automatic refresh and concurrency-safe caching.
     """
     
-    def __init__(self, credential, scope: str):
+    def __init__(self, credential, scope: str, session: Optional[aiohttp.ClientSession] = None):
         """
         Initialize the Azure client base
         
         Args:
             credential: Azure credential instance
             scope: The token scope for this client
+            session: Optional aiohttp session (defaults to the shared session)
         """
         self.credential = credential
         self.scope = scope
         self.token: Optional[str] = None
         self.token_expiry = datetime.min.replace(tzinfo=timezone.utc)
-        self._lock = Lock()  # Thread lock to prevent concurrent token refresh
+        self._lock = asyncio.Lock()  # Prevents concurrent token refresh without blocking the event loop
+        self._session = session
+    
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        HTTP session used for REST calls
+        
+        Returns:
+            aiohttp.ClientSession: Injected session, or the process-wide shared session
+        """
+        if self._session is not None and not self._session.closed:
+            return self._session
+        return get_session()
  
     async def _refresh_token(self):
         """
         Refresh the token if it has expired or does not exist.
-        Thread-safe to handle concurrent requests.
+        Safe for concurrent coroutines: only one refresh runs at a time.
         """
         now = datetime.now(timezone.utc)
         thread_id = threading.get_ident()
-        now_est = now.astimezone(pytz.timezone(DEFAULT_TIMEZONE))
         if VERBOSE_AUTH_LOGGING:
-            logger.info(f"[Thread {thread_id}] checking token at {now_est}")
+            logger.info(f"[Thread {thread_id}] checking token at {now.astimezone(_LOG_TIMEZONE)}")
 
         if self.token and now < self.token_expiry:
             if VERBOSE_AUTH_LOGGING:
-                token_expiry_est = self.token_expiry.astimezone(pytz.timezone(DEFAULT_TIMEZONE))
+                token_expiry_est = self.token_expiry.astimezone(_LOG_TIMEZONE)
                 logger.info(f"[Thread {thread_id}] Reusing existing Azure token. Valid until {token_expiry_est.isoformat()}.")
             return  # Token is still valid; no need to refresh
 
-        with self._lock:
+        async with self._lock:
             now = datetime.now(timezone.utc)
             if self.token and now < self.token_expiry:
                 if VERBOSE_AUTH_LOGGING:
-                    token_expiry_est = self.token_expiry.astimezone(pytz.timezone(DEFAULT_TIMEZONE))
-                    logger.info(f"[Thread {thread_id}] Token was refreshed by another thread. Reusing existing token. Valid until {token_expiry_est.isoformat()}.")
+                    token_expiry_est = self.token_expiry.astimezone(_LOG_TIMEZONE)
+                    logger.info(f"[Thread {thread_id}] Token was refreshed by another task. Reusing existing token. Valid until {token_expiry_est.isoformat()}.")
                 return
 
             if VERBOSE_AUTH_LOGGING:
                 logger.info(f"[Thread {thread_id}] Refreshing Azure token.")
             try:
-                new_token = await get_token_async(self.credential, self.scope)
-                self.token = new_token
-                self.token_expiry = now + timedelta(minutes=TOKEN_LF)  # Adjust based on token TTL
+                access_token = await get_token_async(self.credential, self.scope)
+                self.token = access_token.token
+                if access_token.expires_on:
+                    # Reuse the token until shortly before it actually expires
+                    self.token_expiry = (
+                        datetime.fromtimestamp(access_token.expires_on, tz=timezone.utc)
+                        - timedelta(seconds=TOKEN_REFRESH_MARGIN_SECONDS)
+                    )
+                else:
+                    self.token_expiry = now + timedelta(minutes=TOKEN_LF)  # Fallback when no expiry is reported
                 if VERBOSE_AUTH_LOGGING:
-                    token_expiry_est = self.token_expiry.astimezone(pytz.timezone(DEFAULT_TIMEZONE))
+                    token_expiry_est = self.token_expiry.astimezone(_LOG_TIMEZONE)
                     logger.info(f"[Thread {thread_id}] New token acquired. Valid until {token_expiry_est.isoformat()}.")
             except TokenAcquisitionError as e:
                 logger.error(f"[Thread {thread_id}] Failed to acquire token: {e}")
@@ -151,20 +183,67 @@ class AzureClientBase:
             "Content-Type": HTTP_CONTENT_TYPE_JSON, 
             "Authorization": f"{HTTP_AUTH_BEARER_PREFIX} {self.token}"
         }
+    
+    @staticmethod
+    async def _check_response(response: aiohttp.ClientResponse, operation: str,
+                              success_codes: Collection[int] = HTTP_SUCCESS_CODES):
+        """
+        Log unexpected response statuses and raise for HTTP errors
+        
+        Args:
+            response: Response to check
+            operation: Operation name used in log messages
+            success_codes: Status codes considered successful
+            
+        Raises:
+            aiohttp.ClientResponseError: If the response status is 400 or above
+        """
+        if response.status in success_codes:
+            return
+        logger.error(f"   {operation} API Error: {response.status}")
+        logger.error(f"   Response text: {await response.text()}")
+        response.raise_for_status()
+    
+    @classmethod
+    async def _json_response(cls, response: aiohttp.ClientResponse, operation: str,
+                             success_codes: Collection[int] = HTTP_SUCCESS_CODES) -> Any:
+        """
+        Check a response and decode its JSON body
+        
+        Args:
+            response: Response to check and decode
+            operation: Operation name used in log messages
+            success_codes: Status codes considered successful
+            
+        Returns:
+            Any: Decoded JSON body
+            
+        Raises:
+            aiohttp.ClientResponseError: If the response status is 400 or above
+        """
+        await cls._check_response(response, operation, success_codes)
+        return orjson.loads(await response.read())
 
 
 def create_credential() -> DefaultAzureCredential:
     """
-    Create Azure credential with proper configuration
+    Get the process-wide Azure credential, creating it on first use
+    
+    All clients share one credential so its in-memory token cache is reused
+    instead of each client acquiring tokens from scratch.
     
     Returns:
         DefaultAzureCredential: Configured credential instance
     """
+    global _credential
+    if _credential is not None:
+        return _credential
+    
     try:
         logger.info(f"Creating DefaultAzureCredential with client ID: {AZURE_CLIENT_ID}")
         
         # Create credential with explicit configuration
-        credential = DefaultAzureCredential(
+        _credential = DefaultAzureCredential(
             managed_identity_client_id=AZURE_CLIENT_ID,  # optional
             exclude_interactive_browser_credential=True,  # Exclude interactive auth in container
             exclude_visual_studio_code_credential=True,   # Exclude VS Code auth in container
@@ -174,8 +253,17 @@ def create_credential() -> DefaultAzureCredential:
         )
         
         logger.info("DefaultAzureCredential created successfully")
-        return credential
+        return _credential
         
     except Exception as e:
         logger.error(f"Failed to create DefaultAzureCredential: {e}")
         raise
+
+
+async def close_credential():
+    """Close the shared Azure credential if it was created"""
+    global _credential
+    if _credential is not None:
+        await _credential.close()
+        logger.info("Shared Azure credential closed")
+    _credential = None
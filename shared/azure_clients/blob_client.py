@@ -5,17 +5,19 @@ This module provides a direct client for Azure Blob Storage API with managed ide
 authentication and file download capabilities.
 """
 
+import asyncio
 import logging
-import requests
-from datetime import datetime, timezone
-from typing import Tuple, Optional
+import aiohttp
+from typing import Tuple, Optional, AsyncIterator
 
 from azure_clients.auth import AzureClientBase
 from utils.retry import retry_logic
+from utils.clock import http_date_now
 from utils.exceptions import BlobNotFoundError
 from config.settings import (
-    REQUEST_TIMEOUT_SECONDS, MAX_RETRIES, RETRY_DELAY_SECONDS, 
-    HTTP_AUTH_BEARER_PREFIX, AZURE_STORAGE_SCOPE, STORAGE_API_VERSION
+    MAX_RETRIES, RETRY_DELAY_SECONDS, 
+    HTTP_AUTH_BEARER_PREFIX, AZURE_STORAGE_SCOPE, STORAGE_API_VERSION,
+    BLOB_STREAM_CHUNK_SIZE_BYTES, BLOB_DOWNLOAD_CHUNK_SIZE_BYTES, BLOB_DOWNLOAD_MAX_CONCURRENCY
 )
 
 logger = logging.getLogger(__name__)
@@ -29,15 +31,16 @@ class DirectBlobClient(AzureClientBase):
     for accessing and downloading blobs from Azure Storage.
     """
     
-    def __init__(self, account_url: str, credential):
+    def __init__(self, account_url: str, credential, session: Optional[aiohttp.ClientSession] = None):
         """
         Initialize the Blob client
         
         Args:
             account_url: Azure Storage account URL
             credential: Azure credential instance
+            session: Optional aiohttp session (defaults to the shared session)
         """
-        super().__init__(credential, AZURE_STORAGE_SCOPE)
+        super().__init__(credential, AZURE_STORAGE_SCOPE, session)
         self.account_url = account_url.rstrip('/')
         
     async def _get_storage_headers(self) -> dict:
@@ -51,7 +54,7 @@ class DirectBlobClient(AzureClientBase):
         return {
             "Authorization": f"{HTTP_AUTH_BEARER_PREFIX} {self.token}",
             "x-ms-version": STORAGE_API_VERSION,
-            "x-ms-date": datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT')
+            "x-ms-date": http_date_now()
         }
         
     @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
@@ -72,32 +75,37 @@ class DirectBlobClient(AzureClientBase):
         url = f"{self.account_url}/{container_name}/{blob_name}"
         headers = await self._get_storage_headers()
         
-        response = requests.head(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
-        
-        if response.status_code == 404:
-            # Blob not found - raise specific exception
-            raise BlobNotFoundError(blob_name, container_name, f"Blob not found: {response.status_code}")
-        elif response.status_code != 200:
-            logger.error(f"Blob Properties API Error: {response.status_code} - {response.text}")
-        
-        response.raise_for_status()
-        
-        return {
-            'size': int(response.headers.get('Content-Length', 0)),
-            'content_type': response.headers.get('Content-Type', ''),
-            'last_modified': response.headers.get('Last-Modified', ''),
-            'etag': response.headers.get('ETag', ''),
-            'content_encoding': response.headers.get('Content-Encoding', ''),
-        }
+        async with self.session.head(url, headers=headers) as response:
+            if response.status == 404:
+                # Blob not found - raise specific exception
+                raise BlobNotFoundError(blob_name, container_name, f"Blob not found: {response.status}")
+            
+            await self._check_response(response, "Blob Properties", success_codes=(200,))
+            
+            return {
+                'size': int(response.headers.get('Content-Length', 0)),
+                'content_type': response.headers.get('Content-Type', ''),
+                'last_modified': response.headers.get('Last-Modified', ''),
+                'etag': response.headers.get('ETag', ''),
+                'content_encoding': response.headers.get('Content-Encoding', ''),
+            }
         
     @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
-    async def download_blob(self, container_name: str, blob_name: str) -> bytes:
+    async def download_blob(self, container_name: str, blob_name: str,
+                            chunk_size: int = BLOB_DOWNLOAD_CHUNK_SIZE_BYTES,
+                            max_concurrency: int = BLOB_DOWNLOAD_MAX_CONCURRENCY) -> bytes:
         """
-        Download blob content using direct HTTP call
+        Download blob content using direct HTTP calls
+        
+        The first range request returns the total size; anything beyond the
+        first chunk is then fetched as concurrent range requests pinned to the
+        same ETag, so large blobs download over several connections at once.
         
         Args:
             container_name: Name of the container
             blob_name: Name of the blob
+            chunk_size: Size of each range request in bytes
+            max_concurrency: Maximum concurrent range requests
             
         Returns:
             bytes: Blob content
@@ -106,18 +114,164 @@ class DirectBlobClient(AzureClientBase):
             Exception: If API call fails after all retries
         """
         url = f"{self.account_url}/{container_name}/{blob_name}"
+        first_chunk, total_size, etag = await self._download_range(url, container_name, blob_name, 0, chunk_size)
+        return await self._download_remaining(url, container_name, blob_name, first_chunk, total_size, etag,
+                                              chunk_size, max_concurrency)
+    
+    @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
+    async def download_first_range(self, container_name: str, blob_name: str,
+                                   chunk_size: int = BLOB_DOWNLOAD_CHUNK_SIZE_BYTES) -> Tuple[bytes, int, str]:
+        """
+        Download the first chunk of a blob along with its total size
+        
+        Lets callers check the size before committing to the rest of the
+        download, without a separate HEAD request.
+        
+        Args:
+            container_name: Name of the container
+            blob_name: Name of the blob
+            chunk_size: Size of the first range request in bytes
+            
+        Returns:
+            Tuple[bytes, int, str]: (first chunk, total blob size, blob ETag)
+        """
+        url = f"{self.account_url}/{container_name}/{blob_name}"
+        return await self._download_range(url, container_name, blob_name, 0, chunk_size)
+    
+    @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
+    async def download_remaining(self, container_name: str, blob_name: str, first_chunk: bytes,
+                                 total_size: int, etag: str,
+                                 chunk_size: int = BLOB_DOWNLOAD_CHUNK_SIZE_BYTES,
+                                 max_concurrency: int = BLOB_DOWNLOAD_MAX_CONCURRENCY) -> bytes:
+        """
+        Download the rest of a blob whose first chunk is already in hand
+        
+        Args:
+            container_name: Name of the container
+            blob_name: Name of the blob
+            first_chunk: Content returned by download_first_range
+            total_size: Total blob size returned by download_first_range
+            etag: Blob ETag returned by download_first_range
+            chunk_size: Size of each range request in bytes
+            max_concurrency: Maximum concurrent range requests
+            
+        Returns:
+            bytes: Full blob content
+        """
+        url = f"{self.account_url}/{container_name}/{blob_name}"
+        return await self._download_remaining(url, container_name, blob_name, first_chunk, total_size, etag,
+                                              chunk_size, max_concurrency)
+    
+    async def _download_remaining(self, url: str, container_name: str, blob_name: str, first_chunk: bytes,
+                                  total_size: int, etag: str, chunk_size: int, max_concurrency: int) -> bytes:
+        """
+        Fetch everything after the first chunk as concurrent range requests
+        
+        Args:
+            url: Blob URL
+            container_name: Name of the container
+            blob_name: Name of the blob
+            first_chunk: Content of the first range
+            total_size: Total blob size
+            etag: ETag the blob must still match
+            chunk_size: Size of each range request in bytes
+            max_concurrency: Maximum concurrent range requests
+            
+        Returns:
+            bytes: Full blob content
+        """
+        if total_size <= len(first_chunk):
+            return first_chunk
+        
+        buffer = bytearray(total_size)
+        buffer[:len(first_chunk)] = first_chunk
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch_range(offset: int):
+            async with semaphore:
+                length = min(chunk_size, total_size - offset)
+                data, _, _ = await self._download_range(url, container_name, blob_name, offset, length, etag)
+                buffer[offset:offset + len(data)] = data
+        
+        await asyncio.gather(*(fetch_range(offset) for offset in range(len(first_chunk), total_size, chunk_size)))
+        return bytes(buffer)
+    
+    async def _download_range(self, url: str, container_name: str, blob_name: str, offset: int, length: int,
+                              etag: Optional[str] = None) -> Tuple[bytes, int, str]:
+        """
+        Download one byte range of a blob
+        
+        Args:
+            url: Blob URL
+            container_name: Name of the container
+            blob_name: Name of the blob
+            offset: First byte to download
+            length: Number of bytes to download
+            etag: ETag the blob must still match (for follow-up ranges)
+            
+        Returns:
+            Tuple[bytes, int, str]: (range content, total blob size, blob ETag)
+            
+        Raises:
+            BlobNotFoundError: If the blob does not exist
+        """
         headers = await self._get_storage_headers()
+        headers["x-ms-range"] = f"bytes={offset}-{offset + length - 1}"
+        if etag:
+            headers["If-Match"] = etag
+        
+        async with self.session.get(url, headers=headers) as response:
+            if response.status == 404:
+                # Blob not found - raise specific exception
+                raise BlobNotFoundError(blob_name, container_name, f"Blob not found: {response.status}")
+            if response.status == 416 and offset == 0:
+                # Ranges are not satisfiable on an empty blob
+                return b"", 0, response.headers.get('ETag', '')
+            
+            await self._check_response(response, "Blob Download", success_codes=(200, 206))
+            data = await response.read()
+            
+            # Content-Range is "bytes <start>-<end>/<total>"; a plain 200 carries the whole blob
+            content_range = response.headers.get('Content-Range')
+            total_size = int(content_range.rsplit('/', 1)[1]) if content_range else len(data)
+            return data, total_size, response.headers.get('ETag', '')
+    
+    async def iter_blob_chunks(self, container_name: str, blob_name: str,
+                               chunk_size: int = BLOB_STREAM_CHUNK_SIZE_BYTES,
+                               offset: int = 0, etag: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        Stream blob content in chunks as they arrive from the service
         
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
+        Unlike download_blob this is not retried, since a partially consumed
+        stream cannot be transparently restarted.
         
-        if response.status_code == 404:
-            # Blob not found - raise specific exception
-            raise BlobNotFoundError(blob_name, container_name, f"Blob not found: {response.status_code}")
-        elif response.status_code != 200:
-            logger.error(f"Blob Download API Error: {response.status_code} - {response.text}")
+        Args:
+            container_name: Name of the container
+            blob_name: Name of the blob
+            chunk_size: Maximum size of each yielded chunk in bytes
+            offset: First byte to stream from
+            etag: ETag the blob must still match (when resuming after a first range)
+            
+        Yields:
+            bytes: Next chunk of blob content
+            
+        Raises:
+            BlobNotFoundError: If the blob does not exist
+        """
+        url = f"{self.account_url}/{container_name}/{blob_name}"
+        headers = await self._get_storage_headers()
+        if offset:
+            headers["x-ms-range"] = f"bytes={offset}-"
+        if etag:
+            headers["If-Match"] = etag
         
-        response.raise_for_status()
-        return response.content
+        async with self.session.get(url, headers=headers) as response:
+            if response.status == 404:
+                raise BlobNotFoundError(blob_name, container_name, f"Blob not found: {response.status}")
+            
+            await self._check_response(response, "Blob Download", success_codes=(200, 206))
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
         
     @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
     async def delete_blob(self, blob_name: str, container_name: str) -> bool:
@@ -137,20 +291,19 @@ class DirectBlobClient(AzureClientBase):
         url = f"{self.account_url}/{container_name}/{blob_name}"
         headers = await self._get_storage_headers()
         
-        response = requests.delete(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
-        
-        if response.status_code == 404:
-            # Blob already doesn't exist - consider this success
-            logger.info(f"Blob {blob_name} already deleted or doesn't exist")
-            return True
-        elif response.status_code == 202:
-            # Successful deletion
-            logger.debug(f"Successfully deleted blob: {blob_name}")
-            return True
-        else:
-            logger.error(f"Blob Delete API Error: {response.status_code} - {response.text}")
-            response.raise_for_status()
-            return False
+        async with self.session.delete(url, headers=headers) as response:
+            if response.status == 404:
+                # Blob already doesn't exist - consider this success
+                logger.info(f"Blob {blob_name} already deleted or doesn't exist")
+                return True
+            elif response.status == 202:
+                # Successful deletion
+                logger.debug(f"Successfully deleted blob: {blob_name}")
+                return True
+            else:
+                logger.error(f"Blob Delete API Error: {response.status} - {await response.text()}")
+                response.raise_for_status()
+                return False
         
     def get_blob_client(self, container: str, blob: str) -> 'BlobClientWrapper':
         """
@@ -201,11 +354,15 @@ class BlobClientWrapper:
         """
         Download blob (compatibility method)
         
+        Like the SDK downloader, the first chunk is fetched up front so the
+        blob size is known immediately; the rest is downloaded when the caller
+        reads from the returned wrapper.
+        
         Returns:
-            BlobDownloadWrapper: Wrapper with readall method
+            BlobDownloadWrapper: Wrapper with size, readall and chunks
         """
-        content = await self.blob_client.download_blob(self.container_name, self.blob_name)
-        return BlobDownloadWrapper(content)
+        first_chunk, total_size, etag = await self.blob_client.download_first_range(self.container_name, self.blob_name)
+        return BlobDownloadWrapper(self.blob_client, self.container_name, self.blob_name, first_chunk, total_size, etag)
 
 
 class BlobPropertiesWrapper:
@@ -228,14 +385,25 @@ class BlobPropertiesWrapper:
 class BlobDownloadWrapper:
     """Wrapper for blob download to provide compatibility with Azure SDK"""
     
-    def __init__(self, content: bytes):
+    def __init__(self, blob_client: DirectBlobClient, container_name: str, blob_name: str,
+                 first_chunk: bytes, size: int, etag: str):
         """
         Initialize download wrapper
         
         Args:
-            content: Downloaded blob content
+            blob_client: DirectBlobClient instance
+            container_name: Name of the container
+            blob_name: Name of the blob
+            first_chunk: Content of the first range, already downloaded
+            size: Total blob size in bytes
+            etag: Blob ETag the remaining ranges must match
         """
-        self.content = content
+        self.blob_client = blob_client
+        self.container_name = container_name
+        self.blob_name = blob_name
+        self.first_chunk = first_chunk
+        self.size = size
+        self.etag = etag
         
     async def readall(self) -> bytes:
         """
@@ -244,4 +412,21 @@ class BlobDownloadWrapper:
         Returns:
             bytes: Blob content
         """
-        return self.content
+        return await self.blob_client.download_remaining(
+            self.container_name, self.blob_name, self.first_chunk, self.size, self.etag
+        )
+    
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """
+        Stream content chunk by chunk (compatibility method)
+        
+        Yields:
+            bytes: Next chunk of blob content
+        """
+        if self.first_chunk:
+            yield self.first_chunk
+        if self.size > len(self.first_chunk):
+            async for chunk in self.blob_client.iter_blob_chunks(
+                self.container_name, self.blob_name, offset=len(self.first_chunk), etag=self.etag
+            ):
+                yield chunk
@@ -0,0 +1,64 @@
+"""
+Shared HTTP session for Azure REST clients
+
+This module provides a single process-wide aiohttp session so that all direct
+clients reuse pooled keep-alive connections instead of paying a TCP connect and
+TLS handshake on every call.
+"""
+
+import logging
+import aiohttp
+import orjson
+from typing import Any, Optional
+
+from config.settings import (
+    REQUEST_TIMEOUT_SECONDS, HTTP_CONNECTION_LIMIT, HTTP_CONNECTION_LIMIT_PER_HOST,
+    HTTP_KEEPALIVE_TIMEOUT_SECONDS, HTTP_DNS_CACHE_TTL_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def _json_serialize(obj: Any) -> str:
+    """Serialize request bodies passed as json= with orjson instead of the stdlib encoder"""
+    return orjson.dumps(obj).decode()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Get the shared aiohttp session, creating it on first use
+
+    Must be called from within a running event loop.
+
+    Returns:
+        aiohttp.ClientSession: Shared client session
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_CONNECTION_LIMIT,
+            limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT_SECONDS,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL_SECONDS,
+            enable_cleanup_closed=True  # Reclaim TLS transports the server closed without shutdown
+        )
+        # Per-socket timeouts (like requests' timeout) so large downloads are not cut off
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=REQUEST_TIMEOUT_SECONDS,
+            sock_read=REQUEST_TIMEOUT_SECONDS
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout, json_serialize=_json_serialize)
+        logger.info(f"Created shared HTTP session (connection limit: {HTTP_CONNECTION_LIMIT}, per host: {HTTP_CONNECTION_LIMIT_PER_HOST})")
+    return _session
+
+
+async def close_session():
+    """Close the shared aiohttp session if it was created"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("Shared HTTP session closed")
+    _session = None
@@ -7,13 +7,13 @@ authentication and automatic retry logic.
 
 import logging
 import aiohttp
-from typing import List
+from typing import Dict, List, Optional
 
 from azure_clients.auth import AzureClientBase
 from utils.retry import retry_logic
 from config.settings import (
     OPENAI_API_VERSION, OPENAI_EMBEDDING_MODEL, REQUEST_TIMEOUT_SECONDS,
-    MAX_RETRIES, RETRY_DELAY_SECONDS, HTTP_AUTH_BEARER_PREFIX
+    MAX_RETRIES, RETRY_DELAY_SECONDS, HTTP_AUTH_BEARER_PREFIX, OPENAI_EMBEDDINGS_PATH
 )
 
 logger = logging.getLogger(__name__)
@@ -27,7 +27,8 @@ class DirectOpenAIClient(AzureClientBase):
     for generating embeddings using Azure OpenAI services.
     """
     
-    def __init__(self, endpoint: str, credential, scope: str, api_version: str = OPENAI_API_VERSION):
+    def __init__(self, endpoint: str, credential, scope: str, api_version: str = OPENAI_API_VERSION,
+                 session: Optional[aiohttp.ClientSession] = None):
         """
         Initialize the OpenAI client
         
@@ -36,10 +37,28 @@ class DirectOpenAIClient(AzureClientBase):
             credential: Azure credential instance
             scope: Token scope for authentication
             api_version: API version to use
+            session: Optional aiohttp session (defaults to the shared session)
         """
-        super().__init__(credential, scope)
+        super().__init__(credential, scope, session)
         self.endpoint = endpoint.rstrip('/')
         self.api_version = api_version
+        self._embeddings_urls: Dict[str, str] = {}  # Built once per deployment name
+    
+    def _embeddings_url(self, model: str) -> str:
+        """
+        Get the embeddings URL for a deployment, building it on first use
+        
+        Args:
+            model: Deployment / model name
+            
+        Returns:
+            str: Full embeddings request URL
+        """
+        url = self._embeddings_urls.get(model)
+        if url is None:
+            url = f"{self.endpoint}{OPENAI_EMBEDDINGS_PATH.format(model)}?api-version={self.api_version}"
+            self._embeddings_urls[model] = url
+        return url
         
     @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
     async def create_embeddings(self, text: str, model: str = OPENAI_EMBEDDING_MODEL) -> List[float]:
@@ -56,7 +75,7 @@ class DirectOpenAIClient(AzureClientBase):
         Raises:
             Exception: If API call fails after all retries
         """
-        url = f"{self.endpoint}/openai/deployments/{model}/embeddings?api-version={self.api_version}"
+        url = self._embeddings_url(model)
         headers = await self._get_headers()
         
         payload = {
@@ -70,20 +89,46 @@ class DirectOpenAIClient(AzureClientBase):
         logger.info(f"   Model: {model}")
         logger.info(f"   Text length: {len(text)} chars")
         
-        # Use async HTTP client
+        # Use the pooled async HTTP session
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+        async with self.session.post(url, headers=headers, json=payload, timeout=timeout) as response:
+            # Log response details
+            logger.info(f"   OpenAI Response - Status: {response.status}")
+            
+            result = await self._json_response(response, "OpenAI", success_codes=(200,))
+            embedding = result['data'][0]['embedding']
+            logger.info(f"   OpenAI Embeddings successful - Vector dimension: {len(embedding)}")
+            return embedding
+
+    @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
+    async def create_embeddings_batch(self, texts: List[str], model: str = OPENAI_EMBEDDING_MODEL) -> List[List[float]]:
+        """
+        Create embeddings for several texts in a single HTTP call
+        
+        Args:
+            texts: Texts to generate embeddings for
+            model: Model name to use for embeddings
+            
+        Returns:
+            List[List[float]]: Vector embeddings in the same order as texts
+            
+        Raises:
+            Exception: If API call fails after all retries
+        """
+        url = self._embeddings_url(model)
+        headers = await self._get_headers()
+        
+        payload = {
+            "input": texts,
+            "model": model
+        }
+        
+        logger.info(f"   START OPENAI Batch Embeddings Request: {len(texts)} inputs, model {model}")
+        
         timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, headers=headers, json=payload) as response:
-                # Log response details
-                logger.info(f"   OpenAI Response - Status: {response.status}")
-                
-                if response.status != 200:
-                    response_text = await response.text()
-                    logger.error(f"   OpenAI API Error: {response.status}")
-                    logger.error(f"   Response text: {response_text}")
-                    response.raise_for_status()
-                
-                result = await response.json()
-                embedding = result['data'][0]['embedding']
-                logger.info(f"   OpenAI Embeddings successful - Vector dimension: {len(embedding)}")
-                return embedding
\ No newline at end of file
+        async with self.session.post(url, headers=headers, json=payload, timeout=timeout) as response:
+            result = await self._json_response(response, "OpenAI", success_codes=(200,))
+            # Each item carries the index of its input; order by it rather than trusting response order
+            embeddings = [item['embedding'] for item in sorted(result['data'], key=lambda item: item['index'])]
+            logger.info(f"   OpenAI Batch Embeddings successful - {len(embeddings)} vectors")
+            return embeddings
@@ -5,18 +5,22 @@ This module provides a direct HTTP client for Azure AI Search API with managed i
 authentication and document upload capabilities.
 """
 
+import hashlib
 import logging
-import requests
+import aiohttp
+from array import array
 from typing import List, Dict, Any, Optional, Union
 from enum import Enum
 
 from azure_clients.auth import AzureClientBase
 from utils.retry import retry_logic
+from utils.cache import TTLCache
 from config.settings import (
-    SEARCH_API_VERSION, REQUEST_TIMEOUT_SECONDS, HTTP_SUCCESS_CODES,
+    SEARCH_API_VERSION,
     MAX_RETRIES, RETRY_DELAY_SECONDS, HTTP_AUTH_BEARER_PREFIX, VECTOR_DISPLAY_TEXT,
     DOCUMENT_ID_FIELD, DOCUMENT_CONTENT_FIELD, DOCUMENT_VECTOR_FIELD, SEARCH_ACTION_FIELD,
-    SEARCH_ACTION_DELETE
+    SEARCH_ACTION_UPLOAD, SEARCH_ACTION_DELETE, SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_DOCS_INDEX_PATH, SEARCH_DOCS_SEARCH_PATH
 )
 
 logger = logging.getLogger(__name__)
@@ -51,7 +55,7 @@ class DirectSearchClient(AzureClientBase):
     """
     
     def __init__(self, endpoint: str, credential, scope: str, index_name: str, 
-                 api_version: str = SEARCH_API_VERSION):
+                 api_version: str = SEARCH_API_VERSION, session: Optional[aiohttp.ClientSession] = None):
         """
         Initialize the Search client
         
@@ -61,11 +65,17 @@ class DirectSearchClient(AzureClientBase):
             scope: Token scope for authentication
             index_name: Name of the search index
             api_version: API version to use
+            session: Optional aiohttp session (defaults to the shared session)
         """
-        super().__init__(credential, scope)
+        super().__init__(credential, scope, session)
         self.endpoint = endpoint.rstrip('/')
         self.index_name = index_name
         self.api_version = api_version
+        # Request URLs are fixed per client, so build them once
+        self.index_url = f"{self.endpoint}{SEARCH_DOCS_INDEX_PATH.format(index_name)}?api-version={api_version}"
+        self.search_url = f"{self.endpoint}{SEARCH_DOCS_SEARCH_PATH.format(index_name)}?api-version={api_version}"
+        # Query results cached in-process; cleared whenever this client writes to the index
+        self._search_cache = TTLCache(SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_TTL_SECONDS)
         
     @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
     async def upload_documents(self, documents: List[Dict[str, Any]]) -> bool:
@@ -81,7 +91,7 @@ class DirectSearchClient(AzureClientBase):
         Raises:
             Exception: If API call fails after all retries
         """
-        url = f"{self.endpoint}/indexes/{self.index_name}/docs/index?api-version={self.api_version}"
+        url = self.index_url
         headers = await self._get_headers()
         
         payload = {
@@ -103,20 +113,15 @@ class DirectSearchClient(AzureClientBase):
                 sample_doc['vector'] = VECTOR_DISPLAY_TEXT.format(vector_dim)
             logger.info(f"   Document: {sample_doc['id']}")
 
-        response = requests.post(url, headers=headers, json=payload, timeout=REQUEST_TIMEOUT_SECONDS)
-        
-        # Log response details
-        logger.info(f"   Search Response - Status: {response.status_code}")
-        logger.info(f"   Response headers: {dict(response.headers)}")
-        
-        if response.status_code not in HTTP_SUCCESS_CODES:
-            logger.error(f"   Search API Error: {response.status_code}")
-            logger.error(f"   Response text: {response.text}")
-        
-        response.raise_for_status()
+        async with self.session.post(url, headers=headers, json=payload) as response:
+            # Log response details
+            logger.info(f"   Search Response - Status: {response.status}")
+            logger.info(f"   Response headers: {dict(response.headers)}")
+            
+            result = await self._json_response(response, "Search")
         
-        result = response.json()
-        logger.info(f"   Search Upload successful - Response: {result}")
+        self._search_cache.clear()
+        logger.info(f"   Search Upload successful - {len(result.get('value', []))} document results")
         logger.info(f"Successfully uploaded {len(documents)} documents to search index")
         return True
     
@@ -134,7 +139,7 @@ class DirectSearchClient(AzureClientBase):
         Raises:
             Exception: If API call fails after all retries
         """
-        url = f"{self.endpoint}/indexes/{self.index_name}/docs/index?api-version={self.api_version}"
+        url = self.index_url
         headers = await self._get_headers()
         
         payload = {
@@ -149,25 +154,62 @@ class DirectSearchClient(AzureClientBase):
         logger.info(f"   Index: {self.index_name}")
         logger.info(f"   Document ID: {document_id}")
         
-        response = requests.post(url, headers=headers, json=payload, timeout=REQUEST_TIMEOUT_SECONDS)
+        async with self.session.post(url, headers=headers, json=payload) as response:
+            logger.info(f"   Delete Response - Status: {response.status}")
+            
+            result = await self._json_response(response, "Search Delete")
         
-        logger.info(f"   Delete Response - Status: {response.status_code}")
+        self._search_cache.clear()
+        logger.info(f"   Search Delete successful - {len(result.get('value', []))} document results")
+        logger.info(f"Successfully deleted document {document_id} from search index")
+        return True
+    
+    @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
+    async def index_documents(self, actions: List[Dict[str, Any]]) -> bool:
+        """
+        Apply a batch of index actions in a single request
         
-        if response.status_code not in HTTP_SUCCESS_CODES:
-            logger.error(f"   Search Delete API Error: {response.status_code}")
-            logger.error(f"   Response text: {response.text}")
+        Each action is a document carrying its own '@search.action'
+        (upload, merge, mergeOrUpload or delete), so mixed writes cost one
+        round trip instead of one per document.
         
-        response.raise_for_status()
+        Args:
+            actions: List of documents with '@search.action' directives
+            
+        Returns:
+            bool: True if the batch was applied successfully
+            
+        Raises:
+            Exception: If API call fails after all retries
+        """
+        url = self.index_url
+        headers = await self._get_headers()
         
-        result = response.json()
-        logger.info(f"   Search Delete successful - Response: {result}")
-        logger.info(f"Successfully deleted document {document_id} from search index")
+        payload = {
+            "value": actions
+        }
+        
+        logger.info(f"   START SEARCH Index Batch Request:")
+        logger.info(f"   URL: {url}")
+        logger.info(f"   Index: {self.index_name}")
+        logger.info(f"   Action count: {len(actions)}")
+        
+        async with self.session.post(url, headers=headers, json=payload) as response:
+            logger.info(f"   Index Batch Response - Status: {response.status}")
+            
+            result = await self._json_response(response, "Search Index Batch")
+        
+        self._search_cache.clear()
+        logger.info(f"   Search Index Batch successful - {len(result.get('value', []))} document results")
+        logger.info(f"Successfully applied {len(actions)} index actions to search index")
         return True
     
-    @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
     async def update_document(self, document: Dict[str, Any]) -> bool:
         """
-        Update a document by first deleting it (by ID) and then uploading the new version
+        Update a document by replacing it with the new version
+        
+        Uses a single 'upload' index action, which replaces any existing
+        document with the same ID in one request.
         
         Args:
             document: Document to update (must contain 'id' field)
@@ -185,16 +227,7 @@ class DirectSearchClient(AzureClientBase):
         document_id = document[DOCUMENT_ID_FIELD]
         logger.info(f"Starting update operation for document: {document_id}")
         
-        # First delete the existing document
-        try:
-            await self.delete_document(document_id)
-            logger.info(f"Successfully deleted existing document: {document_id}")
-        except Exception as e:
-            # If delete fails because document doesn't exist, that's ok, continue with upload
-            logger.warning(f"Delete operation failed for document {document_id} (document may not exist): {e}")
-        
-        # Then upload the new version
-        return await self.upload_documents([document])
+        return await self.index_documents([{**document, SEARCH_ACTION_FIELD: SEARCH_ACTION_UPLOAD}])
     
     @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
     async def search(self, 
@@ -224,9 +257,6 @@ class DirectSearchClient(AzureClientBase):
             ValueError: If required parameters are missing for the search type
             Exception: If API call fails after all retries
         """
-        url = f"{self.endpoint}/indexes/{self.index_name}/docs/search?api-version={self.api_version}"
-        headers = await self._get_headers()
-        
         # Validate inputs based on search type
         if search_type == SearchType.TEXT_ONLY and not search_text:
             raise ValueError("search_text is required for text-only search")
@@ -235,6 +265,20 @@ class DirectSearchClient(AzureClientBase):
         elif search_type == SearchType.HYBRID and not (search_text or vector):
             raise ValueError("Either search_text or vector (or both) is required for hybrid search")
         
+        # The vector is keyed by a digest of its packed floats rather than a 1536-element tuple
+        vector_digest = hashlib.blake2b(array('d', vector).tobytes(), digest_size=16).digest() if vector else None
+        cache_key = (
+            search_text, vector_digest, search_type, top,
+            tuple(select) if select else None, filter_query, vector_filter_mode
+        )
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"   Search cache hit - Returning {len(cached.documents)} cached documents")
+            return cached
+        
+        url = self.search_url
+        headers = await self._get_headers()
+        
         # Build the search payload
         payload = {
             "top": top,
@@ -276,24 +320,20 @@ class DirectSearchClient(AzureClientBase):
         logger.info(f"   Top Results: {top}")
         logger.info(f"   Filter: {filter_query}")
         
-        response = requests.post(url, headers=headers, json=payload, timeout=REQUEST_TIMEOUT_SECONDS)
-        
-        logger.info(f"   Search Query Response - Status: {response.status_code}")
-        
-        if response.status_code not in HTTP_SUCCESS_CODES:
-            logger.error(f"   Search Query API Error: {response.status_code}")
-            logger.error(f"   Response text: {response.text}")
-        
-        response.raise_for_status()
+        async with self.session.post(url, headers=headers, json=payload) as response:
+            logger.info(f"   Search Query Response - Status: {response.status}")
+            
+            result = await self._json_response(response, "Search Query")
         
-        result = response.json()
         documents = result.get("value", [])
         count = result.get("@odata.count", len(documents))
         
         logger.info(f"   Search Query successful - Found {count} documents")
         logger.info(f"   Returned {len(documents)} documents")
         
-        return SearchResult(documents, count)
+        search_result = SearchResult(documents, count)
+        self._search_cache.set(cache_key, search_result)
+        return search_result
     
     async def search_hybrid(self, 
                            search_text: str,
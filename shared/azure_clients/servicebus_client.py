@@ -5,9 +5,9 @@ This module provides a direct client for Azure Service Bus API with managed iden
 authentication and message processing capabilities.
 """
 
-import json
 import logging
-import requests
+import aiohttp
+import orjson
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -16,7 +16,7 @@ from utils.retry import retry_logic
 from config.settings import (
     REQUEST_TIMEOUT_SECONDS, MAX_RETRIES, RETRY_DELAY_SECONDS,
      AZURE_SERVICEBUS_SCOPE, SERVICEBUS_MAX_MESSAGES,
-    SERVICEBUS_WAIT_TIME
+    SERVICEBUS_WAIT_TIME, TEXT_ENCODING, TEXT_ENCODING_ERRORS
 )
 
 logger = logging.getLogger(__name__)
@@ -30,15 +30,17 @@ class DirectServiceBusClient(AzureClientBase):
     for receiving and managing Service Bus queue messages.
     """
     
-    def __init__(self, namespace_url: str, credential):
+    def __init__(self, namespace_url: str, credential, session: Optional[aiohttp.ClientSession] = None):
         """
         Initialize the Service Bus client
         
         Args:
             namespace_url: Azure Service Bus namespace URL
             credential: Azure credential instance
+            session: Optional aiohttp session (defaults to the shared session)
         """
-        super().__init__(credential, AZURE_SERVICEBUS_SCOPE)
+        super().__init__(credential, AZURE_SERVICEBUS_SCOPE, session)
+        self.request_timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
         self.namespace_url = namespace_url.rstrip('/')
         
     def get_queue_receiver(self, queue_name: str, max_wait_time: int = SERVICEBUS_WAIT_TIME) -> 'ServiceBusQueueReceiver':
@@ -80,6 +82,8 @@ class ServiceBusQueueReceiver:
         self.queue_name = queue_name
         self.max_wait_time = max_wait_time
         self._closed = False
+        self.receive_url = f"{client.namespace_url}/{queue_name}/messages/head"
+        self._broker_properties: Dict[tuple, str] = {}  # Serialized BrokerProperties per (count, wait)
         
     @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
     async def receive_messages(self, max_message_count: int = SERVICEBUS_MAX_MESSAGES, 
@@ -103,55 +107,60 @@ class ServiceBusQueueReceiver:
         wait_time = max_wait_time or self.max_wait_time
         
         # Service Bus REST API endpoint for receiving messages
-        url = f"{self.client.namespace_url}/{self.queue_name}/messages/head"
+        url = self.receive_url
         headers = await self.client._get_headers()
         
+        # The receive parameters rarely change, so serialize each combination only once
+        broker_key = (max_message_count, wait_time)
+        broker_header = self._broker_properties.get(broker_key)
+        if broker_header is None:
+            broker_header = orjson.dumps({
+                "MaxMessages": max_message_count,
+                "TimeToLive": wait_time
+            }).decode()
+            self._broker_properties[broker_key] = broker_header
+        
         # Add Service Bus specific headers
         headers.update({
             "Accept": "application/json",
-            "BrokerProperties": json.dumps({
-                "MaxMessages": max_message_count,
-                "TimeToLive": wait_time
-            })
+            "BrokerProperties": broker_header
         })
         
-        response = requests.post(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
-        
-        # Log response details for debugging
-        logger.info(f"   Status: {response.status_code}")
-        logger.debug(f"   Response headers: {dict(response.headers)}")
-        logger.debug(f"   Response content length: {len(response.content) if response.content else 0}")
-        
-        # Handle no messages available (not an error)
-        if response.status_code == 204:
-            logger.info("   No messages available in queue")
-            return []
-        
-        if response.status_code != 200:
-            logger.error(f"   Service Bus Receive API Error: {response.status_code}")
-            logger.error(f"   Response text: {response.text}")
-        
-        response.raise_for_status()
+        async with self.client.session.post(url, headers=headers, timeout=self.client.request_timeout) as response:
+            content = await response.read()
+            response_headers = response.headers
+            
+            # Log response details for debugging
+            logger.info(f"   Status: {response.status}")
+            logger.debug(f"   Response headers: {dict(response_headers)}")
+            logger.debug(f"   Response content length: {len(content)}")
+            
+            # Handle no messages available (not an error)
+            if response.status == 204:
+                logger.info("   No messages available in queue")
+                return []
+            
+            await self.client._check_response(response, "Service Bus Receive", success_codes=(200,))
         
         # Parse messages from response
         messages = []
         try:
             # Service Bus can return single message or array
-            response_data = response.json() if response.content else []
+            response_data = orjson.loads(content) if content else []
             if not isinstance(response_data, list):
                 response_data = [response_data]
             
             # Get broker properties from response headers
-            broker_properties_header = response.headers.get('BrokerProperties', '{}')
+            broker_properties_header = response_headers.get('BrokerProperties', '{}')
             try:
-                broker_properties = json.loads(broker_properties_header)
-            except (json.JSONDecodeError, TypeError):
+                broker_properties = orjson.loads(broker_properties_header)
+            except (orjson.JSONDecodeError, TypeError):
                 broker_properties = {}
             
             for i, msg_data in enumerate(response_data):
                 # Extract message properties from headers and broker properties
-                message_id = response.headers.get('MessageId') or broker_properties.get('MessageId') or f"msg_{datetime.now().timestamp()}_{i}"
-                lock_token = response.headers.get('LockToken') or broker_properties.get('LockToken')
+                message_id = response_headers.get('MessageId') or broker_properties.get('MessageId') or f"msg_{datetime.now().timestamp()}_{i}"
+                lock_token = response_headers.get('LockToken') or broker_properties.get('LockToken')
                 
                 # If no lock token found, try to extract from individual message data
                 if not lock_token and isinstance(msg_data, dict):
@@ -174,12 +183,12 @@ class ServiceBusQueueReceiver:
         except Exception as e:
             logger.warning(f"Failed to parse Service Bus response: {e}")
             # Create a simple message from raw response
-            if response.content:
+            if content:
                 # Try to extract any lock token from headers
-                lock_token = response.headers.get('LockToken') or response.headers.get('lockToken')
+                lock_token = response_headers.get('LockToken') or response_headers.get('lockToken')
                 message = ServiceBusMessage(
                     message_id=f"msg_{datetime.now().timestamp()}",
-                    body=response.text,
+                    body=content.decode(TEXT_ENCODING, errors=TEXT_ENCODING_ERRORS),
                     lock_token=lock_token,
                     receiver=self
                 )
@@ -212,19 +221,16 @@ class ServiceBusQueueReceiver:
         logger.debug(f"   Message ID: {message.message_id}")
         logger.debug(f"   Lock Token: {message.lock_token}")
         
-        response = requests.delete(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
-        
-        logger.debug(f"   Complete Message Response - Status: {response.status_code}")
-        
-        if response.status_code not in [200, 204]:
-            logger.error(f"   Service Bus Complete API Error: {response.status_code}")
-            logger.error(f"   Response text: {response.text}")
-        
-        # Don't raise for complete operations - log and continue
-        if response.status_code in [200, 204]:
-            logger.debug(f"   Message {message.message_id} completed successfully")
-        else:
-            logger.warning(f"   Failed to complete message {message.message_id}, status: {response.status_code}")
+        async with self.client.session.delete(url, headers=headers, timeout=self.client.request_timeout) as response:
+            logger.debug(f"   Complete Message Response - Status: {response.status}")
+            
+            # Don't raise for complete operations - log and continue
+            if response.status in [200, 204]:
+                logger.debug(f"   Message {message.message_id} completed successfully")
+            else:
+                logger.error(f"   Service Bus Complete API Error: {response.status}")
+                logger.error(f"   Response text: {await response.text()}")
+                logger.warning(f"   Failed to complete message {message.message_id}, status: {response.status}")
         
     @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
     async def abandon_message(self, message: 'ServiceBusMessage') -> None:
@@ -249,19 +255,16 @@ class ServiceBusQueueReceiver:
         logger.debug(f"   Message ID: {message.message_id}")
         logger.debug(f"   Lock Token: {message.lock_token}")
         
-        response = requests.post(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
-        
-        logger.debug(f"   Abandon Message Response - Status: {response.status_code}")
-        
-        if response.status_code not in [200, 204]:
-            logger.error(f"   Service Bus Abandon API Error: {response.status_code}")
-            logger.error(f"   Response text: {response.text}")
-        
-        # Don't raise for abandon operations - log and continue
-        if response.status_code in [200, 204]:
-            logger.debug(f"   Message {message.message_id} abandoned successfully")
-        else:
-            logger.warning(f"   Failed to abandon message {message.message_id}, status: {response.status_code}")
+        async with self.client.session.post(url, headers=headers, timeout=self.client.request_timeout) as response:
+            logger.debug(f"   Abandon Message Response - Status: {response.status}")
+            
+            # Don't raise for abandon operations - log and continue
+            if response.status in [200, 204]:
+                logger.debug(f"   Message {message.message_id} abandoned successfully")
+            else:
+                logger.error(f"   Service Bus Abandon API Error: {response.status}")
+                logger.error(f"   Response text: {await response.text()}")
+                logger.warning(f"   Failed to abandon message {message.message_id}, status: {response.status}")
     
     @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
     async def renew_message_lock(self, message: 'ServiceBusMessage') -> None:
@@ -283,13 +286,12 @@ class ServiceBusQueueReceiver:
         
         logger.debug(f"   Renewing lock for message {message.message_id}")
         
-        response = requests.post(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
-        
-        if response.status_code in [200, 204]:
-            logger.debug(f"   Lock renewed successfully for message {message.message_id}")
-        else:
-            logger.warning(f"   Failed to renew lock for message {message.message_id}, status: {response.status_code}")
-            # Don't raise - let processing continue with original lock
+        async with self.client.session.post(url, headers=headers, timeout=self.client.request_timeout) as response:
+            if response.status in [200, 204]:
+                logger.debug(f"   Lock renewed successfully for message {message.message_id}")
+            else:
+                logger.warning(f"   Failed to renew lock for message {message.message_id}, status: {response.status}")
+                # Don't raise - let processing continue with original lock
         
     async def close(self):
         """Close the queue receiver"""
@@ -330,7 +332,7 @@ class ServiceBusMessage:
         if isinstance(self.body, str):
             return self.body
         elif isinstance(self.body, dict):
-            return json.dumps(self.body)
+            return orjson.dumps(self.body).decode()
         else:
             return str(self.body)
             
@@ -15,7 +15,8 @@ SERVICEBUS_NAMESPACE = os.getenv('SERVICEBUS_NAMESPACE')
 SERVICEBUS_QUEUE_NAME = os.getenv('SERVICEBUS_QUEUE_NAME', 'indexqueue')
 
 # ====== AUTHENTICATION CONFIGURATION ======
-TOKEN_LF = int(os.getenv('TOKEN_LIFETIME_MINUTES', '45'))  # Token lifetime in minutes
+TOKEN_LF = int(os.getenv('TOKEN_LIFETIME_MINUTES', '45'))  # Fallback token lifetime in minutes when the credential reports no expiry
+TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv('TOKEN_REFRESH_MARGIN_SECONDS', '300'))  # Refresh tokens this long before they expire
 TOKEN_ACQUISITION_TIMEOUT_SECONDS = int(os.getenv('TOKEN_ACQUISITION_TIMEOUT_SECONDS', '30'))  # Timeout for token acquisition
 TOKEN_PRE_WARMING_ENABLED = os.getenv('TOKEN_PRE_WARMING_ENABLED', 'true').lower() == 'true'  # Enable token pre-warming at startup
 DELETE_BLOB_AFTER_PROCESSING = os.getenv('DELETE_BLOB_AFTER_PROCESSING', 'true').lower() == 'true'  # Delete blob after successful processing
@@ -33,10 +34,16 @@ CHUNK_MAX_TOKENS = int(os.getenv('CHUNK_MAX_TOKENS', '4000'))  # Max tokens per
 EMBEDDING_MAX_TOKENS = int(os.getenv('EMBEDDING_MAX_TOKENS', '8000'))  # Max tokens for embedding (OpenAI limit)
 OVERLAP_TOKENS = int(os.getenv('OVERLAP_TOKENS', '200'))  # Token overlap between chunks
 ENCODING_MODEL = os.getenv('ENCODING_MODEL', 'cl100k_base')  # Tiktoken encoding model
+TOKENIZER_THREADS = int(os.getenv('TOKENIZER_THREADS', str(os.cpu_count() or 1)))  # Threads for batched tiktoken encoding
 
 # ====== FILE PROCESSING LIMITS ======
 MAX_FILE_SIZE_MB = int(os.getenv('MAX_FILE_SIZE_MB', '100'))  # Maximum file size in MB
 MAX_PAGES_PER_CHUNK = int(os.getenv('MAX_PAGES_PER_CHUNK', '10'))  # For PDF/DOCX chunking
+BLOB_STREAM_CHUNK_SIZE_BYTES = int(os.getenv('BLOB_STREAM_CHUNK_SIZE_BYTES', '65536'))  # Read size when streaming blob downloads
+BLOB_DOWNLOAD_CHUNK_SIZE_BYTES = int(os.getenv('BLOB_DOWNLOAD_CHUNK_SIZE_BYTES', str(4 * 1024 * 1024)))  # Range size for parallel blob downloads
+BLOB_DOWNLOAD_MAX_CONCURRENCY = int(os.getenv('BLOB_DOWNLOAD_MAX_CONCURRENCY', '8'))  # Concurrent range requests per blob download
+PDF_PARALLEL_PAGE_THRESHOLD = int(os.getenv('PDF_PARALLEL_PAGE_THRESHOLD', '200'))  # PDFs with more pages are split across worker processes
+PDF_PROCESS_WORKERS = int(os.getenv('PDF_PROCESS_WORKERS', str(os.cpu_count() or 1)))  # Worker processes for large PDF extraction
 
 # ====== RETRY AND TIMEOUT CONFIGURATION ======
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
@@ -55,6 +62,7 @@ RATE_LIMIT_MAX_WAIT = int(os.getenv('RATE_LIMIT_MAX_WAIT', '300'))  # Maximum wa
 HTTP_PORT = int(os.getenv('HTTP_PORT', '50051'))  # Server port
 HTTP_HOST = os.getenv('HTTP_HOST', '0.0.0.0')  # Server host
 HTTP_LOCALHOST = os.getenv('HTTP_LOCALHOST', 'localhost')  # Localhost for logging
+HTTP_MAX_REQUEST_BYTES = int(os.getenv('HTTP_MAX_REQUEST_BYTES', str(1024 * 1024)))  # Largest accepted request body (webhook batches, manual requests)
 
 # ====== AZURE SERVICE ENDPOINTS AND SCOPES ======
 AZURE_MANAGEMENT_SCOPE = "https://management.azure.com/.default"
@@ -87,12 +95,20 @@ SERVICEBUS_MAX_DELIVERY_COUNT = int(os.getenv('SERVICEBUS_MAX_DELIVERY_COUNT', '
 # ====== CONCURRENT PROCESSING ======
 CONCURRENT_MESSAGE_PROCESSING = int(os.getenv('CONCURRENT_MESSAGE_PROCESSING', '5'))  # Number of concurrent message processing tasks
 CONCURRENT_FILE_PROCESSING = int(os.getenv('CONCURRENT_FILE_PROCESSING', '3'))  # Number of concurrent file processing operations
+SEARCH_UPLOAD_BATCH_SIZE = int(os.getenv('SEARCH_UPLOAD_BATCH_SIZE', '100'))  # Documents per search index upload request (service max: 1000 / 16MB)
+
+# ====== HTTP CLIENT CONNECTION POOL ======
+# Each in-flight message can fan out up to CONCURRENT_FILE_PROCESSING requests
+HTTP_CONNECTION_LIMIT = int(os.getenv('HTTP_CONNECTION_LIMIT', str(CONCURRENT_MESSAGE_PROCESSING * CONCURRENT_FILE_PROCESSING)))
+HTTP_CONNECTION_LIMIT_PER_HOST = int(os.getenv('HTTP_CONNECTION_LIMIT_PER_HOST', str(min(HTTP_CONNECTION_LIMIT, 32))))  # Cap per Azure endpoint to avoid throttling
+HTTP_KEEPALIVE_TIMEOUT_SECONDS = int(os.getenv('HTTP_KEEPALIVE_TIMEOUT_SECONDS', '75'))  # Idle keep-alive connection lifetime
+HTTP_DNS_CACHE_TTL_SECONDS = int(os.getenv('HTTP_DNS_CACHE_TTL_SECONDS', '300'))  # DNS resolution cache lifetime
 
 # ====== FILE TYPE SUPPORT ======
 SUPPORTED_TEXT_EXTENSIONS = ['txt', 'md', 'csv']
 SUPPORTED_STRUCTURED_EXTENSIONS = ['json']
 SUPPORTED_DOCUMENT_EXTENSIONS = ['pdf', 'docx', 'doc']
-ALL_SUPPORTED_EXTENSIONS = SUPPORTED_TEXT_EXTENSIONS + SUPPORTED_STRUCTURED_EXTENSIONS + SUPPORTED_DOCUMENT_EXTENSIONS
+ALL_SUPPORTED_EXTENSIONS = frozenset(SUPPORTED_TEXT_EXTENSIONS + SUPPORTED_STRUCTURED_EXTENSIONS + SUPPORTED_DOCUMENT_EXTENSIONS)  # Set for O(1) lookups
 
 # ====== DOCUMENT PROCESSING CONSTANTS ======
 PARAGRAPHS_PER_PAGE = int(os.getenv('PARAGRAPHS_PER_PAGE', '20'))  # Artificial page breaks for DOCX
@@ -116,6 +132,8 @@ SEARCH_ACTION_DELETE = 'delete'
 SEARCH_DOCS_INDEX_PATH = '/indexes/{}/docs/index'
 SEARCH_DOCS_SEARCH_PATH = '/indexes/{}/docs/search'
 OPENAI_EMBEDDINGS_PATH = '/openai/deployments/{}/embeddings'
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv('SEARCH_CACHE_TTL_SECONDS', '60'))  # Lifetime of cached query results (0 disables)
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '256'))  # Maximum cached queries per search client
 
 # ====== DOCUMENT FIELD NAMES ======
 DOCUMENT_ID_FIELD = 'id'
@@ -125,6 +143,7 @@ SEARCH_ACTION_FIELD = '@search.action'
 
 # ====== LOGGING CONFIGURATION ======
 TOKEN_PREVIEW_LENGTH = int(os.getenv('TOKEN_PREVIEW_LENGTH', '20'))  # Length of token preview in logs
+CONTENT_PREVIEW_LENGTH = int(os.getenv('CONTENT_PREVIEW_LENGTH', '256'))  # Max characters of message/response payloads in logs
 VECTOR_DISPLAY_TEXT = "[Vector with {} dimensions]"
 DEFAULT_TIMEZONE = os.getenv('DEFAULT_TIMEZONE', 'US/Eastern')  # For logging timestamps
 
@@ -134,14 +153,22 @@ VERBOSE_AUTH_LOGGING = os.getenv('VERBOSE_AUTH_LOGGING', 'false').lower() == 'tr
 VERBOSE_BATCH_LOGGING = os.getenv('VERBOSE_BATCH_LOGGING', 'True').lower() == 'true'  # Log detailed batch results
 
 # ====== PROCESSING INTERVALS ======
-MAIN_LOOP_SLEEP_SECONDS = int(os.getenv('MAIN_LOOP_SLEEP_SECONDS', '3600'))  # 1 hour
 ERROR_RETRY_SLEEP_SECONDS = int(os.getenv('ERROR_RETRY_SLEEP_SECONDS', '5'))  # Error retry delay
 
 # ====== MCP SERVER CONFIGURATION ======
 MCP_SERVER_NAME = os.getenv('MCP_SERVER_NAME', 'azure-search-mcp')
 MCP_SERVER_VERSION = os.getenv('MCP_SERVER_VERSION', '1.0.0')
 MCP_PORT = int(os.getenv('MCP_PORT', '8080'))  # MCP server port
+MCP_GZIP_MINIMUM_SIZE = int(os.getenv('MCP_GZIP_MINIMUM_SIZE', '1000'))  # Gzip MCP responses larger than this many bytes
+MCP_EMBEDDING_CACHE_SIZE = int(os.getenv('MCP_EMBEDDING_CACHE_SIZE', '1024'))  # Query embeddings kept in the MCP server's LRU cache
+MCP_EMBEDDING_BATCH_SIZE = int(os.getenv('MCP_EMBEDDING_BATCH_SIZE', '16'))  # Max concurrent query embeddings coalesced into one OpenAI call
+MCP_EMBEDDING_BATCH_WINDOW_MS = int(os.getenv('MCP_EMBEDDING_BATCH_WINDOW_MS', '5'))  # How long to wait for more queries before sending a batch
+MCP_SEMANTIC_CACHE_SIZE = int(os.getenv('MCP_SEMANTIC_CACHE_SIZE', '256'))  # Vector/hybrid results kept for reuse by similar queries
+MCP_SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv('MCP_SEMANTIC_CACHE_TTL_SECONDS', '300'))  # Lifetime of semantically cached results (0 disables)
+MCP_SEMANTIC_CACHE_THRESHOLD = float(os.getenv('MCP_SEMANTIC_CACHE_THRESHOLD', '0.95'))  # Minimum query cosine similarity to reuse a result
+MCP_MAX_INFLIGHT_SEARCHES = int(os.getenv('MCP_MAX_INFLIGHT_SEARCHES', '32'))  # Concurrent Azure Search queries before callers queue
+MCP_BATCH_SEARCH_MAX_QUERIES = int(os.getenv('MCP_BATCH_SEARCH_MAX_QUERIES', '20'))  # Most queries accepted in one batch_search call
 SEARCH_DEFAULT_TOP = int(os.getenv('SEARCH_DEFAULT_TOP', '10'))  # Default number of search results
 SEARCH_MAX_TOP = int(os.getenv('SEARCH_MAX_TOP', '100'))  # Maximum number of search results
 SEARCH_ALL_DOCS_MAX = int(os.getenv('SEARCH_ALL_DOCS_MAX', '100000'))  # Maximum number of documents for get-all-docs
-EXCLUDED_FIELDS = os.getenv('EXCLUDED_FIELDS', 'vector').split(',')  # Fields to exclude from search results
+EXCLUDED_FIELDS = frozenset(os.getenv('EXCLUDED_FIELDS', 'vector').split(','))  # Fields to exclude from search results
@@ -13,12 +13,13 @@ from typing import Dict, Any, List, Optional
 from azure_clients import create_credential, DirectOpenAIClient, DirectSearchClient, DirectBlobClient
 from utils import TokenAwareChunker, retry_logic
 from utils.exceptions import BlobNotFoundError, ProcessingSkippedError
+from utils.blob_url import blob_file_extension
 from processing.file_extractor import FileExtractor
 from config.settings import (
     STORAGE_ACCOUNT_NAME, SEARCH_SERVICE_NAME, OPENAI_SERVICE_NAME, SEARCH_INDEX_NAME,
     BLOB_ENDPOINT_SUFFIX, SEARCH_ENDPOINT_SUFFIX, AZURE_SEARCH_SCOPE, AZURE_COGNITIVE_SCOPE,
     CHUNK_MAX_TOKENS, EMBEDDING_MAX_TOKENS, SUPPORTED_DOCUMENT_EXTENSIONS,
-    CONCURRENT_FILE_PROCESSING, EMBEDDING_VECTOR_DIMENSION, OPENAI_EMBEDDING_MODEL,
+    CONCURRENT_FILE_PROCESSING, EMBEDDING_VECTOR_DIMENSION, OPENAI_EMBEDDING_MODEL, SEARCH_UPLOAD_BATCH_SIZE,
     SEARCH_ACTION_UPLOAD, DOCUMENT_ID_FIELD, DOCUMENT_CONTENT_FIELD, DOCUMENT_VECTOR_FIELD,
     SEARCH_ACTION_FIELD, MAX_RETRIES, RETRY_DELAY_SECONDS, TOKEN_PRE_WARMING_ENABLED,
     VERBOSE_AUTH_LOGGING, DELETE_BLOB_AFTER_PROCESSING
@@ -48,125 +49,143 @@ class DocumentProcessor:
         """
         Initialize Azure clients using managed identity
         
+        Each client's setup (including its token pre-warming) runs concurrently,
+        so startup pays for one round of token acquisition instead of one per
+        service. When pre-warming is enabled the acquired client tokens already
+        prove managed identity access, so the separate credential probe is skipped.
+        
         Raises:
             Exception: If client initialization fails
         """
         try:
             logger.info("   Initializing Azure clients with managed identity authentication...")
             
-            # Test credential to verify managed identity access
-            from config.settings import AZURE_MANAGEMENT_SCOPE
-            token = await self.credential.get_token(AZURE_MANAGEMENT_SCOPE)
-            logger.info("   User-Assigned Managed Identity authentication verified successfully")
-            
-            # Initialize Blob Storage client with managed identity
-            if STORAGE_ACCOUNT_NAME:
-                blob_service_url = f"https://{STORAGE_ACCOUNT_NAME}{BLOB_ENDPOINT_SUFFIX}"
-                self.blob_client = DirectBlobClient(
-                    account_url=blob_service_url,
-                    credential=self.credential
-                )
-                logger.info(f"   INITIALIZED Blob Storage client for {STORAGE_ACCOUNT_NAME}")
-                
-                # Initialize file extractor
-                self.file_extractor = FileExtractor(self.blob_client)
-            
-            # Initialize Search client with direct HTTP calls
-            if SEARCH_SERVICE_NAME:
-                self.search_client = DirectSearchClient(
-                    endpoint=f"https://{SEARCH_SERVICE_NAME}{SEARCH_ENDPOINT_SUFFIX}",
-                    credential=self.credential,
-                    scope=AZURE_SEARCH_SCOPE,
-                    index_name=SEARCH_INDEX_NAME
-                )
-                logger.info(f"   INITIALIZED Search client for {SEARCH_SERVICE_NAME}")
-            
-            # Initialize OpenAI client with direct HTTP calls
-            if OPENAI_SERVICE_NAME:
-                # Use the service-specific endpoint with custom subdomain for token authentication
-                openai_endpoint = f"https://{OPENAI_SERVICE_NAME}.openai.azure.com"
-                
-                self.openai_client = DirectOpenAIClient(
-                    endpoint=openai_endpoint,
-                    credential=self.credential,
-                    scope=AZURE_COGNITIVE_SCOPE
-                )
-                logger.info(f"   INITIALIZED OpenAI client with endpoint {openai_endpoint}")
+            initializers = [
+                self._initialize_blob_client(),
+                self._initialize_search_client(),
+                self._initialize_openai_client()
+            ]
+            if not TOKEN_PRE_WARMING_ENABLED:
+                logger.info("   Token pre-warming disabled - tokens will be acquired on-demand")
+                initializers.append(self._verify_credential())
             
-            logger.info("   All Azure clients initialized successfully")
+            results = await asyncio.gather(*initializers)
             
-            # Pre-warm all client tokens for faster processing (if enabled)
             if TOKEN_PRE_WARMING_ENABLED:
-                await self.pre_warm_all_tokens()
-            else:
-                logger.info("   Token pre-warming disabled - tokens will be acquired on-demand")
+                # None means the service is not configured; otherwise the pre-warm outcome
+                pre_warmed = [result for result in results if result is not None]
+                if pre_warmed and not any(pre_warmed):
+                    raise Exception("Managed identity authentication failed - no client token could be acquired")
+                if pre_warmed:
+                    logger.info("   User-Assigned Managed Identity authentication verified successfully")
+            
+            logger.info("   All Azure clients initialized successfully")
                 
         except Exception as e:
             logger.error(f"   Failed to initialize clients: {e}")
             raise
     
-    async def pre_warm_all_tokens(self):
+    async def _verify_credential(self):
         """
-        Pre-warm tokens for all Azure clients to ensure they're ready for processing
+        Test the credential to verify managed identity access
         
-        This method acquires tokens for all clients during startup so that
-        file processing doesn't have to wait for token acquisition.
+        Raises:
+            Exception: If no token can be acquired with the credential
         """
-        if VERBOSE_AUTH_LOGGING:
-            logger.info("   Starting token pre-warming for all Azure clients...")
+        from config.settings import AZURE_MANAGEMENT_SCOPE
+        await self.credential.get_token(AZURE_MANAGEMENT_SCOPE)
+        logger.info("   User-Assigned Managed Identity authentication verified successfully")
+    
+    async def _initialize_blob_client(self) -> Optional[bool]:
+        """
+        Initialize the Blob Storage client and file extractor
         
-        pre_warming_tasks = []
+        Returns:
+            Optional[bool]: Token pre-warm outcome, or None if storage is not configured
+        """
+        if not STORAGE_ACCOUNT_NAME:
+            return None
         
-        # Pre-warm blob client token
-        if self.blob_client:
-            if VERBOSE_AUTH_LOGGING:
-                logger.info("   Pre-warming Blob Storage token...")
-            pre_warming_tasks.append(
-                ("Blob Storage", self.blob_client.pre_warm_token())
-            )
+        blob_service_url = f"https://{STORAGE_ACCOUNT_NAME}{BLOB_ENDPOINT_SUFFIX}"
+        self.blob_client = DirectBlobClient(
+            account_url=blob_service_url,
+            credential=self.credential
+        )
+        logger.info(f"   INITIALIZED Blob Storage client for {STORAGE_ACCOUNT_NAME}")
         
-        # Pre-warm search client token
-        if self.search_client:
-            if VERBOSE_AUTH_LOGGING:
-                logger.info("   Pre-warming Search token...")
-            pre_warming_tasks.append(
-                ("Azure AI Search", self.search_client.pre_warm_token())
-            )
+        # Initialize file extractor
+        self.file_extractor = FileExtractor(self.blob_client)
         
-        # Pre-warm OpenAI client token
-        if self.openai_client:
-            if VERBOSE_AUTH_LOGGING:
-                logger.info("   Pre-warming OpenAI token...")
-            pre_warming_tasks.append(
-                ("Azure OpenAI", self.openai_client.pre_warm_token())
-            )
+        return await self._pre_warm_client_token("Blob Storage", self.blob_client)
+    
+    async def _initialize_search_client(self) -> Optional[bool]:
+        """
+        Initialize the Search client with direct HTTP calls
         
-        # Execute all pre-warming tasks concurrently
-        if pre_warming_tasks:
-            task_names = [name for name, _ in pre_warming_tasks]
-            tasks = [task for _, task in pre_warming_tasks]
-            
-            if VERBOSE_AUTH_LOGGING:
-                logger.info(f"   Executing concurrent token pre-warming for: {', '.join(task_names)}")
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Log results
-            successful = 0
-            for i, (name, result) in enumerate(zip(task_names, results)):
-                if isinstance(result, Exception):
-                    logger.warning(f"   Token pre-warming failed for {name}: {result}")
-                elif result:
-                    if VERBOSE_AUTH_LOGGING:
-                        logger.info(f"   Token pre-warming successful for {name}")
-                    successful += 1
-                else:
-                    logger.warning(f"   Token pre-warming returned False for {name}")
+        Returns:
+            Optional[bool]: Token pre-warm outcome, or None if search is not configured
+        """
+        if not SEARCH_SERVICE_NAME:
+            return None
+        
+        self.search_client = DirectSearchClient(
+            endpoint=f"https://{SEARCH_SERVICE_NAME}{SEARCH_ENDPOINT_SUFFIX}",
+            credential=self.credential,
+            scope=AZURE_SEARCH_SCOPE,
+            index_name=SEARCH_INDEX_NAME
+        )
+        logger.info(f"   INITIALIZED Search client for {SEARCH_SERVICE_NAME}")
+        
+        return await self._pre_warm_client_token("Azure AI Search", self.search_client)
+    
+    async def _initialize_openai_client(self) -> Optional[bool]:
+        """
+        Initialize the OpenAI client with direct HTTP calls
+        
+        Returns:
+            Optional[bool]: Token pre-warm outcome, or None if OpenAI is not configured
+        """
+        if not OPENAI_SERVICE_NAME:
+            return None
+        
+        # Use the service-specific endpoint with custom subdomain for token authentication
+        openai_endpoint = f"https://{OPENAI_SERVICE_NAME}.openai.azure.com"
+        
+        self.openai_client = DirectOpenAIClient(
+            endpoint=openai_endpoint,
+            credential=self.credential,
+            scope=AZURE_COGNITIVE_SCOPE
+        )
+        logger.info(f"   INITIALIZED OpenAI client with endpoint {openai_endpoint}")
+        
+        return await self._pre_warm_client_token("Azure OpenAI", self.openai_client)
+    
+    async def _pre_warm_client_token(self, name: str, client) -> bool:
+        """
+        Pre-warm a client's token so file processing doesn't wait for token acquisition
+        
+        Failures are logged but not raised; the token will be acquired on demand.
+        
+        Args:
+            name: Display name of the service for logging
+            client: Azure client to pre-warm
             
+        Returns:
+            bool: True if the token was pre-warmed, False otherwise
+        """
+        if not TOKEN_PRE_WARMING_ENABLED:
+            return False
+        
+        if VERBOSE_AUTH_LOGGING:
+            logger.info(f"   Pre-warming {name} token...")
+        
+        if await client.pre_warm_token():
             if VERBOSE_AUTH_LOGGING:
-                logger.info(f"   Token pre-warming complete: {successful}/{len(task_names)} successful")
-        else:
-            if VERBOSE_AUTH_LOGGING:
-                logger.info("   No clients available for token pre-warming")
+                logger.info(f"   Token pre-warming successful for {name}")
+            return True
+        
+        logger.warning(f"   Token pre-warming returned False for {name}")
+        return False
     
     @retry_logic(max_retries=MAX_RETRIES, delay=RETRY_DELAY_SECONDS)
     async def generate_embeddings(self, text: str) -> List[float]:
@@ -266,8 +285,22 @@ class DocumentProcessor:
             if not documents_to_index:
                 raise Exception("No documents to index - all embedding generations failed")
             
-            # Batch upload documents using direct HTTP call
-            success = await self.search_client.upload_documents(documents_to_index)
+            # Split into upload batches and send them concurrently, bounded by the same
+            # concurrency limit as embedding generation
+            batches = [
+                documents_to_index[i:i + SEARCH_UPLOAD_BATCH_SIZE]
+                for i in range(0, len(documents_to_index), SEARCH_UPLOAD_BATCH_SIZE)
+            ]
+            upload_semaphore = asyncio.Semaphore(CONCURRENT_FILE_PROCESSING)
+            
+            async def upload_batch_with_semaphore(batch: List[Dict[str, Any]]) -> bool:
+                async with upload_semaphore:
+                    return await self.search_client.upload_documents(batch)
+            
+            if len(batches) > 1:
+                logger.info(f"Uploading {len(documents_to_index)} chunks in {len(batches)} batches")
+            upload_results = await asyncio.gather(*[upload_batch_with_semaphore(batch) for batch in batches])
+            success = all(upload_results)
             
             if success:
                 logger.info(f"Successfully indexed {len(documents_to_index)} chunks for document {base_document['blob_name']}")
@@ -305,7 +338,7 @@ class DocumentProcessor:
                 return
             
             # Determine chunking strategy based on file type
-            file_extension = blob_name.lower().split('.')[-1] if '.' in blob_name else ''
+            file_extension = blob_file_extension(blob_name)
             
             if file_extension in SUPPORTED_DOCUMENT_EXTENSIONS and len(pages) > 1:
                 # Use page-aware chunking for documents
@@ -6,23 +6,155 @@ text files, PDFs, Word documents, and JSON files with intelligent structure pres
 """
 
 import io
-import json
+import os
+import sys
+import orjson
+import asyncio
 import logging
-import PyPDF2
-from docx import Document
-from typing import Tuple, List, Any
+import zipfile
+import multiprocessing
+import pypdfium2 as pdfium
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from lxml import etree
+from typing import Tuple, List, Any, Optional, Dict, Callable, Awaitable
 
 from azure_clients import DirectBlobClient
 from utils.exceptions import BlobNotFoundError, ProcessingSkippedError
+from utils.blob_url import blob_file_extension
 
 from config.settings import (
-    MAX_FILE_SIZE_MB, SUPPORTED_TEXT_EXTENSIONS, SUPPORTED_STRUCTURED_EXTENSIONS,
-    SUPPORTED_DOCUMENT_EXTENSIONS, TEXT_ENCODING, TEXT_ENCODING_ERRORS,
-    PARAGRAPHS_PER_PAGE, PAGE_PREFIX, SECTION_PREFIX, PAGE_SUFFIX
+    MAX_FILE_SIZE_MB, SUPPORTED_TEXT_EXTENSIONS, SUPPORTED_STRUCTURED_EXTENSIONS, TEXT_ENCODING, TEXT_ENCODING_ERRORS,
+    PARAGRAPHS_PER_PAGE, PAGE_PREFIX, SECTION_PREFIX, PAGE_SUFFIX,
+    PDF_PARALLEL_PAGE_THRESHOLD, PDF_PROCESS_WORKERS
 )
 
 logger = logging.getLogger(__name__)
 
+# WordprocessingML tags read straight from word/document.xml
+_DOCX_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_PARAGRAPH_TAG = f"{_DOCX_NAMESPACE}p"
+_DOCX_TEXT_TAG = f"{_DOCX_NAMESPACE}t"
+
+# Stack marker for leaving a labelled value in FileExtractor._extract_text_from_json
+_JSON_EXIT = object()
+
+# PDFium is not thread-safe, so in-process PDF parsing is serialized on one dedicated thread.
+# Large PDFs are split into page ranges and parsed in separate worker processes instead.
+_PDF_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdfium")
+# Other CPU-bound extraction (DOCX XML, JSON walking) runs here so it never blocks the event loop
+_EXTRACTION_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="extract")
+_pdf_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pdf_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the PDF worker process pool, creating it on first use
+    
+    Uses the spawn start method so workers don't inherit the event loop or
+    the PDFium thread state of this process.
+    
+    Returns:
+        ProcessPoolExecutor: Shared worker pool
+    """
+    global _pdf_process_pool
+    if _pdf_process_pool is None:
+        _pdf_process_pool = ProcessPoolExecutor(
+            max_workers=PDF_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_process_pool
+
+
+def _read_pdf_pages(pdf: pdfium.PdfDocument, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of a range of pages from an open PDF (blocking)
+    
+    Args:
+        pdf: Open PDFium document
+        start: Index of the first page to extract
+        stop: Index after the last page to extract
+        
+    Returns:
+        List[str]: Formatted page contents for pages that contain text
+    """
+    pages: List[str] = []
+    for page_num in range(start, stop):
+        try:
+            page = pdf[page_num]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    # PDFium reports line breaks as CRLF
+                    page_text = textpage.get_text_range().replace('\r\n', '\n').strip()
+                finally:
+                    textpage.close()
+            finally:
+                page.close()
+            
+            if page_text:
+                pages.append(f"{PAGE_PREFIX}{page_num + 1}{PAGE_SUFFIX}\n{page_text}")
+        except Exception as e:
+            logger.warning(f"Failed to extract text from PDF page {page_num + 1}: {e}")
+            continue
+    return pages
+
+
+def _extract_pdf_pages(content: bytes, start: int = 0, stop: Optional[int] = None) -> List[str]:
+    """
+    Extract the text of a range of PDF pages with PDFium (blocking)
+    
+    Runs the native PDFium parser, so it should be called off the event loop.
+    Defined at module level so it can be sent to worker processes.
+    
+    Args:
+        content: PDF file content as bytes
+        start: Index of the first page to extract
+        stop: Index after the last page to extract (defaults to the end)
+        
+    Returns:
+        List[str]: Formatted page contents for pages that contain text
+    """
+    pdf = pdfium.PdfDocument(content)
+    try:
+        return _read_pdf_pages(pdf, start, len(pdf) if stop is None else stop)
+    finally:
+        pdf.close()
+
+
+def _extract_pdf_pages_up_to(content: bytes, max_pages: int) -> Tuple[int, Optional[List[str]]]:
+    """
+    Extract every page of a PDF in one pass if it has at most max_pages pages (blocking)
+    
+    Small documents are parsed once instead of being opened to count pages
+    and then again to extract them.
+    
+    Args:
+        content: PDF file content as bytes
+        max_pages: Largest page count to extract in this call
+        
+    Returns:
+        Tuple[int, Optional[List[str]]]: (page count, pages, or None if the document is larger)
+    """
+    pdf = pdfium.PdfDocument(content)
+    try:
+        page_count = len(pdf)
+        if page_count > max_pages:
+            return page_count, None
+        return page_count, _read_pdf_pages(pdf, 0, page_count)
+    finally:
+        pdf.close()
+
+
+def _flush_section(paragraphs: List[str], pages: List[str]) -> None:
+    """
+    Append buffered DOCX paragraphs to the page list as one numbered section
+    
+    Args:
+        paragraphs: Non-empty paragraph texts of the current section
+        pages: Page list to append the formatted section to
+    """
+    pages.append(f"{SECTION_PREFIX}{len(pages) + 1}{PAGE_SUFFIX}\n" + "\n".join(paragraphs))
+
 
 class FileExtractor:
     """
@@ -65,45 +197,27 @@ class FileExtractor:
                 blob=blob_name
             )
             
-            # Check file size
-            blob_properties = await blob_client.get_blob_properties()
-            file_size_mb = blob_properties.size / (1024 * 1024)
+            # The first range reports the blob size, so oversized files are skipped without a HEAD request
+            blob_data = await blob_client.download_blob()
             
+            # Check file size
+            file_size_mb = blob_data.size / (1024 * 1024)
             if file_size_mb > MAX_FILE_SIZE_MB:
                 raise ProcessingSkippedError(
                     f"File size ({file_size_mb:.2f}MB) exceeds limit ({MAX_FILE_SIZE_MB}MB)",
                     blob_name
                 )
             
-            # Download blob content
-            blob_data = await blob_client.download_blob()
-            content = await blob_data.readall()
-            
-            file_extension = blob_name.lower().split('.')[-1] if '.' in blob_name else ''
+            file_extension = blob_file_extension(blob_name)
+            handler = self._EXTENSION_HANDLERS.get(file_extension)
             
-            if file_extension in SUPPORTED_TEXT_EXTENSIONS:
-                text_content = content.decode(TEXT_ENCODING, errors=TEXT_ENCODING_ERRORS)
-                return text_content, [text_content]  # Single page for text files
-            
-            elif file_extension in SUPPORTED_STRUCTURED_EXTENSIONS:
-                try:
-                    json_data = json.loads(content.decode(TEXT_ENCODING))
-                    text_content = self._extract_text_from_json(json_data)
-                    return text_content, [text_content]
-                except json.JSONDecodeError:
-                    text_content = content.decode(TEXT_ENCODING, errors=TEXT_ENCODING_ERRORS)
-                    return text_content, [text_content]
-            
-            elif file_extension in SUPPORTED_DOCUMENT_EXTENSIONS:
-                if file_extension == 'pdf':
-                    return await self._extract_pdf_content(content)
-                elif file_extension in ['docx', 'doc']:
-                    return await self._extract_docx_content(content)
-            
-            else:
-                # For other file types, return metadata
+            if handler is None:
+                # For other file types, return metadata without downloading the rest of the blob
                 content_text = f"Binary file: {blob_name} (Size: {file_size_mb:.2f}MB, Type: {file_extension})"
                 return content_text, [content_text]
+            
+            content = await blob_data.readall()
+            return await handler(self, content)
                 
         except BlobNotFoundError:
             # Re-raise blob not found errors to be handled by calling code
@@ -115,6 +229,52 @@ class FileExtractor:
             logger.error(f"Failed to extract content from {blob_name}: {e}")
             raise
     
+    async def _extract_plain_text_content(self, content: bytes) -> Tuple[str, List[str]]:
+        """
+        Extract content from a plain text file as a single page
+        
+        Args:
+            content: File content as bytes
+            
+        Returns:
+            Tuple[str, List[str]]: (full_content, pages_list)
+        """
+        text_content = content.decode(TEXT_ENCODING, errors=TEXT_ENCODING_ERRORS)
+        return text_content, [text_content]
+    
+    async def _extract_structured_content(self, content: bytes) -> Tuple[str, List[str]]:
+        """
+        Extract content from a JSON file on the extraction thread pool
+        
+        Args:
+            content: File content as bytes
+            
+        Returns:
+            Tuple[str, List[str]]: (full_content, pages_list)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_EXTRACTION_EXECUTOR, self._extract_structured_content_sync, content)
+    
+    def _extract_structured_content_sync(self, content: bytes) -> Tuple[str, List[str]]:
+        """
+        Extract content from a JSON file, falling back to plain text if it does not parse (blocking)
+        
+        Args:
+            content: File content as bytes
+            
+        Returns:
+            Tuple[str, List[str]]: (full_content, pages_list)
+        """
+        # orjson parses the raw bytes directly; only files that are not valid JSON are decoded as text
+        try:
+            json_data = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            text_content = content.decode(TEXT_ENCODING, errors=TEXT_ENCODING_ERRORS)
+            return text_content, [text_content]
+        
+        json_text = self._extract_text_from_json(json_data)
+        return json_text, [json_text]
+    
     async def _extract_pdf_content(self, content: bytes) -> Tuple[str, List[str]]:
         """
         Extract content from PDF, preserving page structure
@@ -126,27 +286,28 @@ class FileExtractor:
             Tuple[str, List[str]]: (full_content, pages_list)
         """
         try:
-            pdf_file = io.BytesIO(content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            pages = []
-            full_content = ""
+            # Parsing is CPU-bound native work; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            max_inline_pages = PDF_PARALLEL_PAGE_THRESHOLD if PDF_PROCESS_WORKERS > 1 else sys.maxsize
+            page_count, pages = await loop.run_in_executor(
+                _PDF_EXECUTOR, _extract_pdf_pages_up_to, content, max_inline_pages
+            )
             
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        page_content = f"{PAGE_PREFIX}{page_num + 1}{PAGE_SUFFIX}\n{page_text.strip()}"
-                        pages.append(page_content)
-                        full_content += page_content + "\n\n"
-                except Exception as e:
-                    logger.warning(f"Failed to extract text from PDF page {page_num + 1}: {e}")
-                    continue
+            if pages is None:
+                # Split large documents into one page range per worker process
+                step = -(-page_count // PDF_PROCESS_WORKERS)
+                pool = _get_pdf_process_pool()
+                range_results = await asyncio.gather(*(
+                    loop.run_in_executor(pool, _extract_pdf_pages, content, start, min(start + step, page_count))
+                    for start in range(0, page_count, step)
+                ))
+                pages = [page for range_pages in range_results for page in range_pages]
+                logger.info(f"Extracted {page_count} PDF pages across {len(range_results)} worker processes")
             
             if not pages:
                 return "No readable text found in PDF", []
             
-            return full_content.strip(), pages
+            return "\n\n".join(pages), pages
             
         except Exception as e:
             logger.error(f"Failed to process PDF: {e}")
@@ -154,7 +315,20 @@ class FileExtractor:
     
     async def _extract_docx_content(self, content: bytes) -> Tuple[str, List[str]]:
         """
-        Extract content from DOCX, preserving paragraph structure
+        Extract content from DOCX on the extraction thread pool
+        
+        Args:
+            content: DOCX file content as bytes
+            
+        Returns:
+            Tuple[str, List[str]]: (full_content, pages_list)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_EXTRACTION_EXECUTOR, self._extract_docx_content_sync, content)
+    
+    def _extract_docx_content_sync(self, content: bytes) -> Tuple[str, List[str]]:
+        """
+        Extract content from DOCX, preserving paragraph structure (blocking)
         
         Args:
             content: DOCX file content as bytes
@@ -163,41 +337,26 @@ class FileExtractor:
             Tuple[str, List[str]]: (full_content, pages_list)
         """
         try:
-            docx_file = io.BytesIO(content)
-            doc = Document(docx_file)
-            
-            pages = []
-            current_page = ""
-            paragraph_count = 0
-            paragraphs_per_page = PARAGRAPHS_PER_PAGE  # Arbitrary page break
-            
-            full_content = ""
-            
-            for paragraph in doc.paragraphs:
-                para_text = paragraph.text.strip()
-                if para_text:
-                    current_page += para_text + "\n"
-                    paragraph_count += 1
-                    
-                    # Create artificial "pages" based on paragraph count
-                    if paragraph_count >= paragraphs_per_page:
-                        if current_page.strip():
-                            page_content = f"{SECTION_PREFIX}{len(pages) + 1}{PAGE_SUFFIX}\n{current_page.strip()}"
-                            pages.append(page_content)
-                            full_content += page_content + "\n\n"
-                        current_page = ""
-                        paragraph_count = 0
-            
-            # Add remaining content as final page
-            if current_page.strip():
-                page_content = f"{SECTION_PREFIX}{len(pages) + 1}{PAGE_SUFFIX}\n{current_page.strip()}"
-                pages.append(page_content)
-                full_content += page_content + "\n\n"
+            paragraphs: List[str] = []
+            
+            # Stream the paragraphs out of the document XML instead of building the python-docx object model
+            with zipfile.ZipFile(io.BytesIO(content)) as docx_zip, docx_zip.open("word/document.xml") as document_xml:
+                for _, paragraph in etree.iterparse(document_xml, tag=_DOCX_PARAGRAPH_TAG):
+                    para_text: str = "".join(run.text or "" for run in paragraph.iter(_DOCX_TEXT_TAG)).strip()
+                    paragraph.clear()  # Free the parsed element so memory stays flat on long documents
+                    if para_text:
+                        paragraphs.append(para_text)
+            
+            # Create artificial "pages" of a fixed paragraph count by slicing, rather than counting per paragraph
+            pages: List[str] = []
+            paragraphs_per_page: int = max(PARAGRAPHS_PER_PAGE, 1)  # Arbitrary page break
+            for start in range(0, len(paragraphs), paragraphs_per_page):
+                _flush_section(paragraphs[start:start + paragraphs_per_page], pages)
             
             if not pages:
                 return "No readable text found in document", []
             
-            return full_content.strip(), pages
+            return "\n\n".join(pages), pages
             
         except Exception as e:
             logger.error(f"Failed to process DOCX: {e}")
@@ -205,7 +364,12 @@ class FileExtractor:
     
     def _extract_text_from_json(self, data: Any) -> str:
         """
-        Recursively extract text values from JSON
+        Extract text values from JSON
+        
+        Walks the structure iteratively with an explicit stack, so deeply
+        nested documents neither hit the recursion limit nor rebuild joined
+        strings at every level. Each value is labelled with its key (or list
+        index) on the first line it produces; empty values are skipped.
         
         Args:
             data: JSON data to extract text from
@@ -213,22 +377,46 @@ class FileExtractor:
         Returns:
             str: Extracted text content
         """
-        if isinstance(data, dict):
-            texts = []
-            for key, value in data.items():
-                # Include key names for context
-                text_value = self._extract_text_from_json(value)
-                if text_value:
-                    texts.append(f"{key}: {text_value}")
-            return '\n'.join(texts)
-        elif isinstance(data, list):
-            texts = []
-            for i, item in enumerate(data):
-                text_value = self._extract_text_from_json(item)
-                if text_value:
-                    texts.append(f"[{i}] {text_value}")
-            return '\n'.join(texts)
-        elif isinstance(data, str):
-            return data
-        else:
-            return str(data)
+        lines: List[str] = []
+        pending_labels: List[str] = []  # Labels of enclosing values that have not produced a line yet
+        stack: List[Tuple[Optional[str], Any]] = [(None, data)]
+        
+        while stack:
+            label, node = stack.pop()
+            
+            if node is _JSON_EXIT:
+                # Leaving a labelled value; drop its label if it produced no text
+                if pending_labels:
+                    pending_labels.pop()
+                continue
+            
+            if label is not None:
+                pending_labels.append(label)
+            
+            children: List[Tuple[Optional[str], Any]]
+            if isinstance(node, dict):
+                children = [(f"{key}: ", value) for key, value in node.items()]
+            elif isinstance(node, list):
+                children = [(f"[{i}] ", item) for i, item in enumerate(node)]
+            else:
+                text = node if isinstance(node, str) else str(node)
+                if text:
+                    lines.append("".join(pending_labels) + text)
+                    pending_labels.clear()
+                children = []
+            
+            # Push in reverse so children are visited in document order, each followed by its exit marker
+            for child in reversed(children):
+                stack.append((None, _JSON_EXIT))
+                stack.append(child)
+        
+        return '\n'.join(lines)
+    
+    # File extension -> extraction method, built once at import
+    _EXTENSION_HANDLERS: Dict[str, Callable[['FileExtractor', bytes], Awaitable[Tuple[str, List[str]]]]] = {
+        **dict.fromkeys(SUPPORTED_TEXT_EXTENSIONS, _extract_plain_text_content),
+        **dict.fromkeys(SUPPORTED_STRUCTURED_EXTENSIONS, _extract_structured_content),
+        'pdf': _extract_pdf_content,
+        'docx': _extract_docx_content,
+        'doc': _extract_docx_content,
+    }
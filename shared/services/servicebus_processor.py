@@ -5,19 +5,20 @@ This module handles Azure Service Bus message processing with concurrent workers
 and automatic message handling for blob creation events.
 """
 
-import json
+import orjson
 import asyncio
 import logging
-from typing import Optional
+from typing import Optional, Set
 
 from azure_clients import create_credential, DirectServiceBusClient
 from processing import DocumentProcessor
+from utils.blob_url import parse_blob_url
 from utils.exceptions import BlobNotFoundError, ProcessingSkippedError, TokenAcquisitionError
 from config.settings import (
     SERVICEBUS_NAMESPACE, SERVICEBUS_QUEUE_NAME, SERVICEBUS_ENDPOINT_SUFFIX,
     SERVICEBUS_MAX_MESSAGES, SERVICEBUS_WAIT_TIME, CONCURRENT_MESSAGE_PROCESSING,
     ERROR_RETRY_SLEEP_SECONDS, TOKEN_PRE_WARMING_ENABLED, VERBOSE_BATCH_LOGGING,
-    SERVICEBUS_LOCK_RENEWAL_ENABLED, SERVICEBUS_LOCK_RENEWAL_INTERVAL
+    SERVICEBUS_LOCK_RENEWAL_ENABLED, SERVICEBUS_LOCK_RENEWAL_INTERVAL, CONTENT_PREVIEW_LENGTH
 )
 
 logger = logging.getLogger(__name__)
@@ -84,8 +85,9 @@ class ServiceBusProcessor:
         """
         Start processing Service Bus messages with concurrent processing
         
-        This method runs continuously, receiving and processing messages
-        from the Service Bus queue using multiple concurrent workers.
+        This method runs continuously as a pipeline: it only receives as many
+        messages as there are free worker slots, and tops the slots back up as
+        soon as any message finishes instead of waiting for a whole batch.
         """
         if not self.servicebus_receiver:
             logger.warning("Service Bus receiver not initialized")
@@ -94,47 +96,34 @@ class ServiceBusProcessor:
         self._processing = True
         logger.info(f"Starting Service Bus message processing with {CONCURRENT_MESSAGE_PROCESSING} concurrent workers...")
         
+        in_flight: Set[asyncio.Task] = set()
         try:
             while self._processing:
                 try:
-                    # Receive messages from Service Bus
+                    free_slots = CONCURRENT_MESSAGE_PROCESSING - len(in_flight)
+                    if free_slots <= 0:
+                        # All workers busy - wait for at least one to finish
+                        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                        self._log_results(done)
+                        continue
+                    
+                    # Receive only as many messages as can be processed right away
                     received_msgs = await self.servicebus_receiver.receive_messages(
-                        max_message_count=SERVICEBUS_MAX_MESSAGES, 
+                        max_message_count=min(SERVICEBUS_MAX_MESSAGES, free_slots), 
                         max_wait_time=SERVICEBUS_WAIT_TIME
                     )
                     
-                    if not received_msgs:
-                        continue
-                    
-                    if VERBOSE_BATCH_LOGGING:
-                        logger.info(f"Received {len(received_msgs)} messages for concurrent processing")
+                    if received_msgs:
+                        if VERBOSE_BATCH_LOGGING:
+                            logger.info(f"Received {len(received_msgs)} messages for concurrent processing ({len(in_flight)} already in flight)")
+                        for msg in received_msgs:
+                            in_flight.add(asyncio.create_task(self._process_single_message(msg)))
                     
-                    # Process messages concurrently using asyncio.gather with semaphore for rate limiting
-                    semaphore = asyncio.Semaphore(CONCURRENT_MESSAGE_PROCESSING)
-                    
-                    async def process_single_message_with_semaphore(msg):
-                        async with semaphore:
-                            return await self._process_single_message(msg)
-                    
-                    # Process all messages concurrently
-                    tasks = [process_single_message_with_semaphore(msg) for msg in received_msgs]
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-                    
-                    # Log results with more detail only if verbose logging is enabled
-                    if VERBOSE_BATCH_LOGGING:
-                        successful = sum(1 for result in results if result is True)
-                        failed = len(results) - successful
-                        logger.info(f"Batch processing complete - Success: {successful}, Failed: {failed}")
-                        
-                        # Log any specific exceptions for debugging
-                        for i, result in enumerate(results):
-                            if isinstance(result, Exception):
-                                logger.debug(f"Message {i} failed with exception: {result}")
-                    else:
-                        # Only log if there are failures when not in verbose mode
-                        failed_count = sum(1 for result in results if isinstance(result, Exception))
-                        if failed_count > 0:
-                            logger.warning(f"Processed {len(results)} messages - {failed_count} failed")
+                    # Reap anything that finished while we were receiving
+                    done = {task for task in in_flight if task.done()}
+                    if done:
+                        in_flight -= done
+                        self._log_results(done)
                     
                 except Exception as e:
                     logger.error(f"Error receiving messages: {e}")
@@ -143,7 +132,37 @@ class ServiceBusProcessor:
         except Exception as e:
             logger.error(f"Service Bus processing error: {e}")
         finally:
+            # Unfinished messages are not completed; their locks expire and they are redelivered
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
             logger.info("Service Bus message processing stopped")
+    
+    def _log_results(self, done: Set[asyncio.Task]):
+        """
+        Log the outcome of finished message processing tasks
+        
+        Args:
+            done: Completed message processing tasks
+        """
+        results = [task.exception() or task.result() for task in done if not task.cancelled()]
+        
+        # Log results with more detail only if verbose logging is enabled
+        if VERBOSE_BATCH_LOGGING:
+            successful = sum(1 for result in results if result is True)
+            failed = len(results) - successful
+            logger.info(f"Message processing complete - Success: {successful}, Failed: {failed}")
+            
+            # Log any specific exceptions for debugging
+            for i, result in enumerate(results):
+                if isinstance(result, Exception):
+                    logger.debug(f"Message {i} failed with exception: {result}")
+        else:
+            # Only log if there are failures when not in verbose mode
+            failed_count = sum(1 for result in results if isinstance(result, Exception))
+            if failed_count > 0:
+                logger.warning(f"Processed {len(results)} messages - {failed_count} failed")
 
     async def _process_single_message(self, msg) -> bool:
         """
@@ -166,13 +185,13 @@ class ServiceBusProcessor:
             
             # Parse message body
             message_body = str(msg)
-            logger.info(f"Processing message: {message_body}")
+            logger.info(f"Processing message: {message_body[:CONTENT_PREVIEW_LENGTH]}")
             
             # Try to parse as JSON
             try:
-                message_data = json.loads(message_body)
-            except json.JSONDecodeError:
-                logger.warning(f"Message not in JSON format, completing message: {message_body}")
+                message_data = orjson.loads(message_body)
+            except orjson.JSONDecodeError:
+                logger.warning(f"Message not in JSON format, completing message: {message_body[:CONTENT_PREVIEW_LENGTH]}")
                 await self.servicebus_receiver.complete_message(msg)
                 if VERBOSE_BATCH_LOGGING:
                     logger.info("Message completed due to invalid JSON format")
@@ -184,26 +203,22 @@ class ServiceBusProcessor:
                 # Event Grid event format
                 event_data = message_data[0]
                 if 'data' in event_data and 'url' in event_data['data']:
-                    blob_url = event_data['data']['url']
                     # Parse blob URL to extract container and blob name
-                    url_parts = blob_url.replace('https://', '').split('/')
-                    if len(url_parts) >= 3:
-                        container_name = url_parts[1]
-                        blob_name = '/'.join(url_parts[2:])
+                    parsed_url = parse_blob_url(event_data['data']['url'])
+                    if parsed_url:
+                        container_name, blob_name = parsed_url
             elif 'blob_name' in message_data and 'container_name' in message_data:
                 # Direct format
                 blob_name = message_data['blob_name']
                 container_name = message_data['container_name']
             elif 'data' in message_data and 'url' in message_data['data']:
                 # Single Event Grid event
-                blob_url = message_data['data']['url']
-                url_parts = blob_url.replace('https://', '').split('/')
-                if len(url_parts) >= 3:
-                    container_name = url_parts[1]
-                    blob_name = '/'.join(url_parts[2:])
+                parsed_url = parse_blob_url(message_data['data']['url'])
+                if parsed_url:
+                    container_name, blob_name = parsed_url
             
             if not blob_name or not container_name:
-                logger.warning(f"Could not extract blob info from message: {message_data}")
+                logger.warning(f"Could not extract blob info from message: {message_body[:CONTENT_PREVIEW_LENGTH]}")
                 await self.servicebus_receiver.complete_message(msg)
                 if VERBOSE_BATCH_LOGGING:
                     logger.info("Message completed due to invalid blob information")
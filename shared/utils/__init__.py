@@ -4,3 +4,6 @@ Utilities package for Azure File Processing Microservice
 
 from .retry import retry_logic
 from .chunking import TokenAwareChunker
+from .cache import TTLCache
+from .clock import iso_now, iso_now_bytes, http_date_now
+from .blob_url import parse_blob_url, blob_file_extension
@@ -0,0 +1,47 @@
+"""
+Blob URL and blob name parsing for blob-created events
+
+This module extracts the container and blob name from the blob URLs carried by
+Event Grid events, whether they arrive over the webhook or through Service Bus,
+and the file extension that decides how a blob is processed.
+"""
+
+import posixpath
+import re
+from typing import Optional, Tuple
+
+# https://<account>.blob.core.windows.net/<container>/<blob path>
+_BLOB_URL_PATTERN = re.compile(r'^https?://[^/]+/([^/]+)/(.+)$')
+
+
+def parse_blob_url(blob_url: str) -> Optional[Tuple[str, str]]:
+    """
+    Split a blob URL into its container and blob name in a single match
+    
+    Args:
+        blob_url: Full blob URL
+        
+    Returns:
+        Optional[Tuple[str, str]]: (container_name, blob_name), or None if the URL is not a blob URL
+    """
+    match = _BLOB_URL_PATTERN.match(blob_url)
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+
+def blob_file_extension(blob_name: str) -> str:
+    """
+    Get the lowercase file extension of a blob name, without the dot
+    
+    Only the last path segment is considered, and a leading dot marks a hidden
+    file rather than an extension, so 'archive.tar.gz' gives 'gz' while
+    '.hidden' and 'v1.2/readme' give ''.
+    
+    Args:
+        blob_name: Blob name, possibly containing '/'-separated virtual directories
+        
+    Returns:
+        str: Extension such as 'pdf', or an empty string if the name has none
+    """
+    return posixpath.splitext(blob_name)[1][1:].lower()
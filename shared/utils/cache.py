@@ -0,0 +1,81 @@
+"""
+In-memory result cache with LRU eviction and TTL expiry
+
+This module provides a small cache used to short-circuit repeated identical
+requests (such as search queries) without another round trip to Azure.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries expire after a fixed time-to-live
+
+    All operations are synchronous, so the cache is safe to share between tasks
+    on a single event loop without a lock.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initialize the cache
+
+        Args:
+            maxsize: Maximum number of entries kept before evicting the least recently used
+            ttl: Entry lifetime in seconds (0 or less disables caching)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all"""
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value if present and not expired
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[Any]: Cached value, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Store a value, evicting the least recently used entry if full
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if not self.enabled:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -8,15 +8,21 @@ and intelligent boundary preservation (sentences, pages, sections).
 import re
 import logging
 import tiktoken
-from typing import List
+from typing import List, Tuple
 
 from config.settings import (
     ENCODING_MODEL, TIKTOKEN_FALLBACK_MODEL, CHUNK_MAX_TOKENS, OVERLAP_TOKENS,
-    EMBEDDING_FALLBACK_TOKEN_RATIO
+    EMBEDDING_FALLBACK_TOKEN_RATIO, TOKENIZER_THREADS
 )
 
 logger = logging.getLogger(__name__)
 
+# Sentence boundaries: runs of terminal punctuation followed by whitespace or end of text
+_SENTENCE_END_PATTERN = re.compile(r'[.!?]+(?:\s+|$)')
+
+# Any whitespace in a token byte string, used to tell spaced text from unspaced scripts
+_WHITESPACE_BYTES_PATTERN = re.compile(rb'\s')
+
 
 class TokenAwareChunker:
     """
@@ -55,6 +61,37 @@ class TokenAwareChunker:
             logger.warning(f"Token counting failed, using character estimation: {e}")
             return len(text) // EMBEDDING_FALLBACK_TOKEN_RATIO  # Rough estimation: 1 token ≈ 4 characters
     
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens in several texts with one batched tokenizer call
+        
+        Args:
+            texts: The texts to count tokens for
+            
+        Returns:
+            List[int]: Number of tokens in each text, in order
+        """
+        try:
+            return [len(tokens) for tokens in self._encode_batch(texts)]
+        except Exception as e:
+            logger.warning(f"Batch token counting failed, using character estimation: {e}")
+            return [len(text) // EMBEDDING_FALLBACK_TOKEN_RATIO for text in texts]
+    
+    def _encode_batch(self, texts: List[str]) -> List[List[int]]:
+        """
+        Encode several texts to token IDs with one batched tokenizer call
+        
+        Special-token strings in documents are encoded as ordinary text
+        rather than rejected.
+        
+        Args:
+            texts: The texts to encode
+            
+        Returns:
+            List[List[int]]: Token IDs of each text, in order
+        """
+        return self.tokenizer.encode_batch(texts, num_threads=TOKENIZER_THREADS, disallowed_special=())
+    
     def chunk_text(self, text: str, max_tokens: int = CHUNK_MAX_TOKENS, 
                   overlap_tokens: int = OVERLAP_TOKENS) -> List[str]:
         """
@@ -75,9 +112,102 @@ class TokenAwareChunker:
         if self.count_tokens(text) <= max_tokens:
             return [text]
         
-        chunks = []
         sentences = self._split_into_sentences(text)
         
+        try:
+            return self._chunk_sentences(sentences, max_tokens, overlap_tokens)
+        except Exception as e:
+            logger.warning(f"Batch sentence encoding failed, chunking with per-sentence counts: {e}")
+            return self._chunk_sentences_by_count(sentences, max_tokens, overlap_tokens)
+    
+    def _chunk_sentences(self, sentences: List[str], max_tokens: int, overlap_tokens: int) -> List[str]:
+        """
+        Group sentences into chunks using their batched token IDs
+        
+        Args:
+            sentences: The sentences to group
+            max_tokens: Maximum tokens per chunk
+            overlap_tokens: Number of tokens to overlap between chunks
+            
+        Returns:
+            List[str]: List of text chunks
+        """
+        chunks = []
+        
+        # Encode every sentence in one batch; chunk totals are then kept by addition and
+        # overlap is cut from these token IDs, so no chunk is ever re-encoded
+        sentence_token_ids = self._encode_batch(sentences)
+        separator_tokens = len(self._encode_batch([" "])[0])
+        
+        # Pieces of the current chunk, joined with spaces only when emitted. Every piece is
+        # non-empty and already trimmed (sentences, split pieces, overlap), so chunks never
+        # need stripping
+        current_parts: List[str] = []
+        current_token_ids: List[List[int]] = []  # Token IDs of each piece in the current chunk
+        current_tokens = 0
+        
+        for sentence, token_ids in zip(sentences, sentence_token_ids):
+            sentence_tokens = len(token_ids)
+            
+            # If single sentence exceeds max tokens, we need to split it
+            if sentence_tokens > max_tokens:
+                # Add current chunk if not empty
+                if current_parts:
+                    chunks.append(" ".join(current_parts))
+                
+                # Split the long sentence by words or characters
+                sentence_chunks = self._split_long_sentence(sentence, max_tokens)
+                chunks.extend(sentence_chunks[:-1])  # Add all but last
+                
+                # Start new chunk with last piece
+                current_parts = sentence_chunks[-1:]
+                current_token_ids = self._encode_batch(current_parts) if current_parts else []
+                current_tokens = sum(len(ids) for ids in current_token_ids)
+            
+            # If adding this sentence would exceed limit, finalize current chunk
+            elif current_parts and current_tokens + separator_tokens + sentence_tokens > max_tokens:
+                chunks.append(" ".join(current_parts))
+                
+                # Handle overlap
+                overlap_text, overlap_ids = self._get_overlap_text(current_token_ids, overlap_tokens)
+                if overlap_text:
+                    current_parts = [overlap_text, sentence]
+                    current_token_ids = [overlap_ids, token_ids]
+                    current_tokens = len(overlap_ids) + separator_tokens + sentence_tokens
+                else:
+                    current_parts = [sentence]
+                    current_token_ids = [token_ids]
+                    current_tokens = sentence_tokens
+            else:
+                # Add sentence to current chunk
+                if current_parts:
+                    current_tokens += separator_tokens
+                current_parts.append(sentence)
+                current_token_ids.append(token_ids)
+                current_tokens += sentence_tokens
+        
+        # Add final chunk
+        if current_parts:
+            chunks.append(" ".join(current_parts))
+        
+        return chunks
+    
+    def _chunk_sentences_by_count(self, sentences: List[str], max_tokens: int, overlap_tokens: int) -> List[str]:
+        """
+        Group sentences into chunks counting each piece on its own
+        
+        Slower fallback for when batched encoding fails; count_tokens estimates
+        from character length if the tokenizer keeps failing.
+        
+        Args:
+            sentences: The sentences to group
+            max_tokens: Maximum tokens per chunk
+            overlap_tokens: Number of tokens to overlap between chunks
+            
+        Returns:
+            List[str]: List of text chunks
+        """
+        chunks = []
         current_chunk = ""
         current_tokens = 0
         
@@ -87,10 +217,8 @@ class TokenAwareChunker:
             # If single sentence exceeds max tokens, we need to split it
             if sentence_tokens > max_tokens:
                 # Add current chunk if not empty
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                    current_chunk = ""
-                    current_tokens = 0
+                if current_chunk:
+                    chunks.append(current_chunk)
                 
                 # Split the long sentence by words or characters
                 sentence_chunks = self._split_long_sentence(sentence, max_tokens)
@@ -102,12 +230,12 @@ class TokenAwareChunker:
             
             # If adding this sentence would exceed limit, finalize current chunk
             elif current_tokens + sentence_tokens > max_tokens:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
+                if current_chunk:
+                    chunks.append(current_chunk)
                 
                 # Handle overlap
-                overlap_text = self._get_overlap_text(current_chunk, overlap_tokens)
-                current_chunk = overlap_text + " " + sentence
+                overlap_text = self._get_overlap_words(current_chunk, overlap_tokens)
+                current_chunk = overlap_text + " " + sentence if overlap_text else sentence
                 current_tokens = self.count_tokens(current_chunk)
             else:
                 # Add sentence to current chunk
@@ -115,8 +243,8 @@ class TokenAwareChunker:
                 current_tokens += sentence_tokens
         
         # Add final chunk
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        if current_chunk:
+            chunks.append(current_chunk)
         
         return chunks
     
@@ -136,40 +264,34 @@ class TokenAwareChunker:
             return []
         
         chunks = []
-        current_chunk = ""
+        current_pages: List[str] = []  # Pages of the chunk being built, joined only when emitted
         current_tokens = 0
         
-        for page in pages:
-            page_tokens = self.count_tokens(page)
-            
+        for page, page_tokens in zip(pages, self.count_tokens_batch(pages)):
             # If adding this page would exceed limit, finalize current chunk
-            if current_chunk and current_tokens + page_tokens > max_tokens:
-                chunks.append(current_chunk.strip())
-                current_chunk = page
-                current_tokens = page_tokens
-            elif not current_chunk:
-                # First page
-                current_chunk = page
-                current_tokens = page_tokens
-            else:
-                # Add page to current chunk
-                current_chunk += "\n\n" + page
-                current_tokens += page_tokens
+            if current_pages and current_tokens + page_tokens > max_tokens:
+                chunk = "\n\n".join(current_pages).strip()
+                if chunk:
+                    chunks.append(chunk)
+                current_pages = []
+                current_tokens = 0
             
-            # If single page exceeds max tokens, chunk it
             if page_tokens > max_tokens:
-                if current_chunk != page:  # Already added to current chunk
-                    chunks.append(current_chunk.replace(page, "").strip())
-                
-                # Chunk the oversized page
+                # Chunk the oversized page on its own, carrying its last piece forward
                 page_chunks = self.chunk_text(page, max_tokens)
                 chunks.extend(page_chunks[:-1])  # Add all but last
-                current_chunk = page_chunks[-1] if page_chunks else ""
-                current_tokens = self.count_tokens(current_chunk)
+                if page_chunks:
+                    current_pages = [page_chunks[-1]]
+                    current_tokens = self.count_tokens(page_chunks[-1])
+            else:
+                # Add page to current chunk
+                current_pages.append(page)
+                current_tokens += page_tokens
         
         # Add final chunk
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        chunk = "\n\n".join(current_pages).strip()
+        if chunk:
+            chunks.append(chunk)
         
         return chunks
     
@@ -183,9 +305,7 @@ class TokenAwareChunker:
         Returns:
             List[str]: List of sentences
         """
-        # Improved sentence splitting that handles common abbreviations
-        sentence_endings = r'[.!?]+(?:\s+|$)'
-        sentences = re.split(sentence_endings, text)
+        sentences = _SENTENCE_END_PATTERN.split(text)
         
         # Clean up and filter empty sentences
         sentences = [s.strip() for s in sentences if s.strip()]
@@ -203,24 +323,29 @@ class TokenAwareChunker:
             List[str]: List of sentence chunks
         """
         words = sentence.split()
+        word_token_counts = self.count_tokens_batch(words)
         chunks = []
-        current_chunk = ""
+        current_words: List[str] = []
+        current_tokens = 0
         
-        for word in words:
-            test_chunk = current_chunk + " " + word if current_chunk else word
-            if self.count_tokens(test_chunk) > max_tokens:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                    current_chunk = word
-                else:
+        for word, word_tokens in zip(words, word_token_counts):
+            if current_tokens + word_tokens > max_tokens:
+                if current_words:
+                    chunks.append(" ".join(current_words))
+                if word_tokens > max_tokens:
                     # Single word exceeds limit - split by characters
                     chunks.extend(self._split_by_characters(word, max_tokens))
-                    current_chunk = ""
+                    current_words = []
+                    current_tokens = 0
+                else:
+                    current_words = [word]
+                    current_tokens = word_tokens
             else:
-                current_chunk = test_chunk
+                current_words.append(word)
+                current_tokens += word_tokens
         
-        if current_chunk:
-            chunks.append(current_chunk)
+        if current_words:
+            chunks.append(" ".join(current_words))
         
         return chunks
     
@@ -235,18 +360,14 @@ class TokenAwareChunker:
         Returns:
             List[str]: List of character-based chunks
         """
-        chunks = []
         chars_per_token = EMBEDDING_FALLBACK_TOKEN_RATIO  # Rough estimation
-        max_chars = max_tokens * chars_per_token
+        max_chars = max(max_tokens * chars_per_token, 1)
         
-        for i in range(0, len(text), max_chars):
-            chunks.append(text[i:i + max_chars])
-        
-        return chunks
+        return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
     
-    def _get_overlap_text(self, text: str, overlap_tokens: int) -> str:
+    def _get_overlap_words(self, text: str, overlap_tokens: int) -> str:
         """
-        Get the last part of text for overlap
+        Get the last whole words of text for overlap, counting each candidate
         
         Args:
             text: The text to get overlap from
@@ -263,9 +384,89 @@ class TokenAwareChunker:
         
         # Work backwards from the end
         for i in range(len(words) - 1, -1, -1):
-            test_text = " ".join(words[i:]) if overlap_text == "" else " ".join(words[i:])
+            test_text = " ".join(words[i:])
             if self.count_tokens(test_text) > overlap_tokens:
                 break
             overlap_text = test_text
         
         return overlap_text
+    
+    def _get_overlap_text(self, token_ids: List[List[int]], overlap_tokens: int) -> Tuple[str, List[int]]:
+        """
+        Get the last part of a chunk for overlap from its pieces' token IDs
+        
+        Pieces are joined with the same single space as the emitted chunk, so the
+        overlap text and its token count match what the chunk contains.
+        
+        Args:
+            token_ids: Token IDs of each piece of the chunk, in order
+            overlap_tokens: Number of tokens for overlap
+            
+        Returns:
+            Tuple[str, List[int]]: (overlap text, its token IDs)
+        """
+        if overlap_tokens <= 0:
+            return "", []
+        
+        separator_ids = self._encode_batch([" "])[0]
+        
+        # Take whole pieces from the end while they fit, then cut into the piece that doesn't
+        overlap_ids: List[int] = []
+        for ids in reversed(token_ids):
+            joined = ids + separator_ids + overlap_ids if overlap_ids else list(ids)
+            if len(joined) <= overlap_tokens:
+                overlap_ids = joined
+                continue
+            
+            room = overlap_tokens - (len(overlap_ids) + len(separator_ids) if overlap_ids else 0)
+            if room > 0:
+                # Once a separator is in the overlap the text is spaced, so never cut mid-word
+                spaced = bool(overlap_ids or _WHITESPACE_BYTES_PATTERN.search(self.tokenizer.decode_bytes(ids)))
+                start = self._overlap_start(ids, len(ids) - room, spaced)
+                if start < len(ids):
+                    overlap_ids = ids[start:] + separator_ids + overlap_ids if overlap_ids else ids[start:]
+            break
+        
+        if not overlap_ids:
+            return "", []
+        
+        return self.tokenizer.decode(overlap_ids).strip(), overlap_ids
+    
+    def _overlap_start(self, token_ids: List[int], start: int, spaced: bool) -> int:
+        """
+        Move an overlap start forward to a token that begins cleanly when decoded
+        
+        A raw token-count cut can land inside a multi-byte UTF-8 character, which
+        decodes to U+FFFD, or inside a word. The overlap starts at the first token
+        that begins a word; text without spaces (such as CJK) falls back to the
+        first token that begins a character. If a spaced text has no word start
+        within the piece, the overlap starts at the next piece rather than at a
+        word fragment.
+        
+        Args:
+            token_ids: Token IDs of the piece the overlap starts in
+            start: Index the overlap would start at by token count alone
+            spaced: Whether the text separates words with whitespace
+            
+        Returns:
+            int: Adjusted start index (len(token_ids) if no clean start exists)
+        """
+        if start == 0:
+            # The whole piece fits, which is already a clean boundary
+            return 0
+        
+        char_start = None
+        previous_bytes = self.tokenizer.decode_single_token_bytes(token_ids[start - 1])
+        for index in range(start, len(token_ids)):
+            token_bytes = self.tokenizer.decode_single_token_bytes(token_ids[index])
+            # UTF-8 continuation bytes (0b10xxxxxx) mean the token starts mid-character
+            if token_bytes and not 0x80 <= token_bytes[0] < 0xC0:
+                if token_bytes[:1].isspace() or previous_bytes[-1:].isspace():
+                    return index
+                if char_start is None:
+                    char_start = index
+            previous_bytes = token_bytes
+        
+        if char_start is None or spaced:
+            return len(token_ids)
+        return char_start
@@ -0,0 +1,58 @@
+"""
+Cached wall-clock timestamps for hot request paths
+
+This module provides per-second timestamp strings so that health checks,
+API responses and Storage request headers don't build and format a new
+datetime on every call.
+"""
+
+import time
+from datetime import datetime, timezone
+
+# (epoch second, formatted string[, encoded string]) for the most recent call of each helper
+_iso_cache = (0, "", b"")
+_http_date_cache = (0, "")
+
+
+def _refresh_iso_cache() -> tuple:
+    """Return the ISO timestamp cache entry for the current second, rebuilding it if stale"""
+    global _iso_cache
+    now = int(time.time())
+    if now != _iso_cache[0]:
+        formatted = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat()
+        _iso_cache = (now, formatted, formatted.encode())
+    return _iso_cache
+
+
+def iso_now() -> str:
+    """
+    Current UTC time as a naive ISO 8601 string, at one-second resolution
+
+    Returns:
+        str: Timestamp such as 2024-01-01T12:00:00
+    """
+    return _refresh_iso_cache()[1]
+
+
+def iso_now_bytes() -> bytes:
+    """
+    Current UTC time as ASCII-encoded ISO 8601, for splicing into prebuilt response bodies
+
+    Returns:
+        bytes: Timestamp such as b"2024-01-01T12:00:00"
+    """
+    return _refresh_iso_cache()[2]
+
+
+def http_date_now() -> str:
+    """
+    Current UTC time in RFC 1123 format, as used by the x-ms-date header
+
+    Returns:
+        str: Timestamp such as Mon, 01 Jan 2024 12:00:00 GMT
+    """
+    global _http_date_cache
+    now = int(time.time())
+    if now != _http_date_cache[0]:
+        _http_date_cache = (now, datetime.fromtimestamp(now, timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT'))
+    return _http_date_cache[1]
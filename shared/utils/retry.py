@@ -7,10 +7,11 @@ transient errors, and implementing retry logic with exponential backoff.
 
 import re
 import time
+import random
 import asyncio
 import logging
 import functools
-from typing import Callable, Any
+from typing import Callable, Any, Optional, Tuple
 from inspect import iscoroutinefunction
 
 from config.settings import (
@@ -20,6 +21,32 @@ from config.settings import (
 
 logger = logging.getLogger(__name__)
 
+# Rate limit indicators in error messages, matched in one case-insensitive pass
+_RATE_LIMIT_PATTERN = re.compile(r'429|rate limit|quota exceeded|throttled|too many requests', re.IGNORECASE)
+
+# Exception types raised by local bugs or timeouts rather than by a throttling service
+_NEVER_RATE_LIMIT_ERRORS = (KeyError, IndexError, TypeError, AttributeError, TimeoutError)
+
+# Wait-time hint some services embed in error messages
+_RETRY_AFTER_PATTERN = re.compile(r'retry after (\d+) seconds?', re.IGNORECASE)
+
+# x-ratelimit-reset values below this are relative seconds; above it, a Unix timestamp
+_RATE_LIMIT_RESET_EPOCH_THRESHOLD = 1_000_000_000
+
+
+@functools.lru_cache(maxsize=64)
+def _may_describe_rate_limit(error_type: type) -> bool:
+    """
+    Check whether errors of this type can carry a rate limit response or message.
+    
+    Args:
+        error_type: The exception class to check
+        
+    Returns:
+        bool: False for exception types that never report throttling
+    """
+    return not issubclass(error_type, _NEVER_RATE_LIMIT_ERRORS)
+
 
 def _is_rate_limit_error(error: Exception) -> bool:
     """
@@ -31,24 +58,31 @@ def _is_rate_limit_error(error: Exception) -> bool:
     Returns:
         bool: True if it's a rate limit error, False otherwise
     """
-    error_str = str(error).lower()
-    error_codes = ['429', 'rate limit', 'quota exceeded', 'throttled', 'too many requests']
+    # aiohttp.ClientResponseError carries the status code directly, and its message
+    # is only the reason phrase, so the status alone decides
+    status = getattr(error, 'status', None)
+    if isinstance(status, int):
+        return status == 429
+    
+    # Programming errors and the like never describe throttling; skip scanning their text
+    if not _may_describe_rate_limit(type(error)):
+        return False
     
     # Check for Azure-specific rate limit indicators
-    if hasattr(error, 'response') and error.response:
-        status_code = getattr(error.response, 'status_code', None)
-        if status_code == 429:
+    response = getattr(error, 'response', None)
+    if response:
+        if getattr(response, 'status_code', None) == 429:
             return True
         
         # Check response text for rate limit indicators
-        response_text = getattr(error.response, 'text', '')
+        response_text = getattr(response, 'text', '')
         if callable(response_text):
             response_text = response_text()
-        if any(code in str(response_text).lower() for code in error_codes):
+        if _RATE_LIMIT_PATTERN.search(str(response_text)):
             return True
     
     # Check error message for rate limit indicators
-    return any(code in error_str for code in error_codes)
+    return _RATE_LIMIT_PATTERN.search(str(error)) is not None
 
 
 def _get_wait_time_from_error(error: Exception) -> int:
@@ -63,22 +97,27 @@ def _get_wait_time_from_error(error: Exception) -> int:
     """
     try:
         # Check for Retry-After header
+        headers = None
         if hasattr(error, 'response') and error.response:
             headers = getattr(error.response, 'headers', {})
+        elif getattr(error, 'headers', None):
+            # aiohttp.ClientResponseError carries the response headers directly
+            headers = error.headers
+        
+        if headers:
             if 'retry-after' in headers:
                 retry_after = headers['retry-after']
                 return min(int(retry_after), RATE_LIMIT_MAX_WAIT)
             elif 'x-ratelimit-reset' in headers:
-                # Some APIs use x-ratelimit-reset
-                reset_time = int(headers['x-ratelimit-reset'])
-                current_time = int(time.time())
-                wait_time = max(reset_time - current_time, 0)
-                return min(wait_time, RATE_LIMIT_MAX_WAIT)
+                # Some APIs use x-ratelimit-reset, either as seconds to wait or as a reset timestamp
+                reset_value = float(headers['x-ratelimit-reset'])
+                if reset_value >= _RATE_LIMIT_RESET_EPOCH_THRESHOLD:
+                    # Only an absolute timestamp needs the wall clock
+                    reset_value -= time.time()
+                return min(max(int(reset_value), 0), RATE_LIMIT_MAX_WAIT)
         
         # Check error message for wait time hints
-        error_str = str(error).lower()
-        wait_pattern = r'retry after (\d+) seconds?'
-        match = re.search(wait_pattern, error_str)
+        match = _RETRY_AFTER_PATTERN.search(str(error))
         if match:
             return min(int(match.group(1)), RATE_LIMIT_MAX_WAIT)
         
@@ -100,6 +139,8 @@ def _should_skip_retry(error: Exception) -> bool:
         bool: True if retry should be skipped, False otherwise
     """
     # Check for HTTP status codes that shouldn't be retried
+    if getattr(error, 'status', None) in SKIP_RETRY_CODES:
+        return True
     if hasattr(error, 'response') and error.response:
         status_code = getattr(error.response, 'status_code', None)
         if status_code in SKIP_RETRY_CODES:
@@ -114,6 +155,52 @@ def _should_skip_retry(error: Exception) -> bool:
     return False
 
 
+def _next_retry(error: Exception, attempt: int, max_retries: int, delay: float,
+                func_name: str) -> Tuple[int, Optional[float]]:
+    """
+    Decide whether and when to retry after a failed call.
+    
+    Shared by the sync and async wrappers so both follow the same policy.
+    
+    Args:
+        error: The exception raised by the call
+        attempt: Failed attempts so far, not counting rate limit errors
+        max_retries: Maximum number of retry attempts
+        delay: Base delay before the first retry, doubled on each later one
+        func_name: Name of the wrapped function, for logging
+        
+    Returns:
+        Tuple[int, Optional[float]]: (updated attempt count, seconds to wait,
+        or None if the error should be raised)
+    """
+    # Check if this is a permanent failure that shouldn't be retried
+    if _should_skip_retry(error):
+        if VERBOSE_RETRY_LOGGING:
+            logger.warning("Permanent error in %s (no retry): %s", func_name, error)
+        return attempt, None
+    
+    if _is_rate_limit_error(error):
+        wait_time = _get_wait_time_from_error(error)
+        logger.warning(
+            "Rate limit hit in %s. Waiting %d seconds before retry.",
+            func_name, wait_time
+        )
+        # Do not increment the attempt counter for rate limit errors
+        return attempt, wait_time
+    
+    attempt += 1
+    if VERBOSE_RETRY_LOGGING:
+        logger.warning("Attempt %d/%d failed in %s: %s", attempt, max_retries, func_name, error)
+    if attempt < max_retries:
+        # Exponential backoff with jitter so concurrent workers don't retry in lockstep
+        backoff = min(delay * (1 << (attempt - 1)), RATE_LIMIT_MAX_WAIT)
+        return attempt, backoff * (0.5 + random.random())
+    
+    if VERBOSE_RETRY_LOGGING:
+        logger.error("All %d attempts failed in %s. Raising exception.", max_retries, func_name)
+    return attempt, None
+
+
 def retry_logic(max_retries: int = MAX_RETRIES, delay: int = RETRY_DELAY_SECONDS) -> Callable:
     """
     Retry decorator for sync and async functions with rate limit handling.
@@ -130,6 +217,8 @@ def retry_logic(max_retries: int = MAX_RETRIES, delay: int = RETRY_DELAY_SECONDS
     """
     
     def decorator(func: Callable) -> Callable:
+        func_name = func.__name__
+        
         if iscoroutinefunction(func):
             
             @functools.wraps(func)
@@ -139,40 +228,11 @@ def retry_logic(max_retries: int = MAX_RETRIES, delay: int = RETRY_DELAY_SECONDS
                     try:
                         return await func(*args, **kwargs)
                     except Exception as e:
-                        # Check if this is a permanent failure that shouldn't be retried
-                        if _should_skip_retry(e):
-                            if VERBOSE_RETRY_LOGGING:
-                                logger.warning(
-                                    "Permanent error in %s (no retry): %s", 
-                                    func.__name__, e
-                                )
+                        attempt, wait_time = _next_retry(e, attempt, max_retries, delay, func_name)
+                        if wait_time is None:
                             raise
-                        elif _is_rate_limit_error(e):
-                            wait_time = _get_wait_time_from_error(e)
-                            logger.warning(
-                                "Rate limit hit in %s. Waiting %d seconds before retry.",
-                                func.__name__, wait_time
-                            )
-                            await asyncio.sleep(wait_time)
-                            # Do not increment the attempt counter for rate limit errors
-                            continue
-                        else:
-                            attempt += 1
-                            if VERBOSE_RETRY_LOGGING:
-                                logger.warning(
-                                    "Attempt %d/%d failed in %s: %s", 
-                                    attempt, max_retries, func.__name__, e
-                                )
-                            if attempt < max_retries:
-                                await asyncio.sleep(delay)
-                            else:
-                                if VERBOSE_RETRY_LOGGING:
-                                    logger.error(
-                                        "All %d attempts failed in %s. Raising exception.",
-                                        max_retries, func.__name__
-                                    )
-                                raise
-                raise RuntimeError(f"Async retry logic exhausted in {func.__name__}")
+                        await asyncio.sleep(wait_time)
+                raise RuntimeError(f"Async retry logic exhausted in {func_name}")
             
             return async_wrapper
         
@@ -184,40 +244,11 @@ def retry_logic(max_retries: int = MAX_RETRIES, delay: int = RETRY_DELAY_SECONDS
                     try:
                         return func(*args, **kwargs)
                     except Exception as e:
-                        # Check if this is a permanent failure that shouldn't be retried
-                        if _should_skip_retry(e):
-                            if VERBOSE_RETRY_LOGGING:
-                                logger.warning(
-                                    "Permanent error in %s (no retry): %s", 
-                                    func.__name__, e
-                                )
+                        attempt, wait_time = _next_retry(e, attempt, max_retries, delay, func_name)
+                        if wait_time is None:
                             raise
-                        elif _is_rate_limit_error(e):
-                            wait_time = _get_wait_time_from_error(e)
-                            logger.warning(
-                                "Rate limit hit in %s. Waiting %d seconds before retry.",
-                                func.__name__, wait_time
-                            )
-                            time.sleep(wait_time)
-                            # Do not increment the attempt counter for rate limit errors
-                            continue
-                        else:
-                            attempt += 1
-                            if VERBOSE_RETRY_LOGGING:
-                                logger.warning(
-                                    "Attempt %d/%d failed in %s: %s", 
-                                    attempt, max_retries, func.__name__, e
-                                )
-                            if attempt < max_retries:
-                                time.sleep(delay)
-                            else:
-                                if VERBOSE_RETRY_LOGGING:
-                                    logger.error(
-                                        "All %d attempts failed in %s. Raising exception.",
-                                        max_retries, func.__name__
-                                    )
-                                raise
-                raise RuntimeError(f"Sync retry logic exhausted in {func.__name__}")
+                        time.sleep(wait_time)
+                raise RuntimeError(f"Sync retry logic exhausted in {func_name}")
             
             return sync_wrapper
     
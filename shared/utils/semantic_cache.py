@@ -0,0 +1,121 @@
+"""
+In-memory semantic cache keyed by query embeddings
+
+This module provides a small cache that answers a query from a previous
+result when its embedding is close enough to an earlier query's, so
+paraphrased questions can skip the search round trip. It needs numpy and is
+only imported by the MCP server, so it is not re-exported from the package.
+"""
+
+import time
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Fixed-size ring of normalized query embeddings with their cached results
+
+    Lookups compare the query against every cached embedding in a single
+    matrix-vector product. Entries only match within the same namespace
+    (for example the same search type, filter and top), and expire after a
+    fixed time-to-live. All operations are synchronous, so the cache is safe
+    to share between tasks on a single event loop without a lock.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, threshold: float):
+        """
+        Initialize the cache
+
+        Args:
+            maxsize: Maximum number of entries; the oldest is overwritten when full
+            ttl: Entry lifetime in seconds (0 or less disables caching)
+            threshold: Minimum cosine similarity for a cached result to be reused
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        # Allocated on first insert, once the embedding dimension is known
+        self._vectors: Optional[np.ndarray] = None
+        self._namespaces: List[Optional[Hashable]] = [None] * max(maxsize, 0)
+        self._values: List[Any] = [None] * max(maxsize, 0)
+        self._expires = np.zeros(max(maxsize, 0))
+        self._next = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all"""
+        return self.ttl > 0 and self.maxsize > 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        """Convert an embedding to a unit-length float32 vector, or None if it has no length"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def get(self, namespace: Hashable, embedding: List[float]) -> Optional[Any]:
+        """
+        Get the cached value of the most similar live entry in the namespace
+
+        Args:
+            namespace: Key that must match exactly for an entry to be considered
+            embedding: Query embedding
+
+        Returns:
+            Optional[Any]: Cached value, or None if no entry is similar enough
+        """
+        if self._vectors is None:
+            return None
+
+        query = self._normalize(embedding)
+        if query is None or query.shape[0] != self._vectors.shape[1]:
+            return None
+
+        similarities = self._vectors @ query
+        now = time.monotonic()
+        best_index, best_similarity = None, self.threshold
+        for index in np.flatnonzero(similarities >= self.threshold):
+            if (similarities[index] >= best_similarity and self._expires[index] > now
+                    and self._namespaces[index] == namespace):
+                best_index, best_similarity = index, similarities[index]
+
+        return self._values[best_index] if best_index is not None else None
+
+    def set(self, namespace: Hashable, embedding: List[float], value: Any):
+        """
+        Store a value, overwriting the oldest entry if full
+
+        Args:
+            namespace: Key that lookups must match exactly
+            embedding: Query embedding the value answers
+            value: Value to cache
+        """
+        if not self.enabled:
+            return
+
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+        if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+            self.clear()
+            self._vectors = np.zeros((self.maxsize, vector.shape[0]), dtype=np.float32)
+
+        index = self._next
+        self._vectors[index] = vector
+        self._namespaces[index] = namespace
+        self._values[index] = value
+        self._expires[index] = time.monotonic() + self.ttl
+        self._next = (index + 1) % self.maxsize
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._vectors = None
+        self._namespaces = [None] * max(self.maxsize, 0)
+        self._values = [None] * max(self.maxsize, 0)
+        self._expires = np.zeros(max(self.maxsize, 0))
+        self._next = 0
+
+    def __len__(self) -> int:
+        return sum(value is not None for value in self._values)
@@ -0,0 +1,75 @@
+"""
+Tests for token-aware chunk overlap
+
+Uses an in-memory byte-level tiktoken encoding, so every byte of a multi-byte
+UTF-8 character is its own token and no encoding files need downloading.
+"""
+
+import os
+import sys
+
+import pytest
+
+tiktoken = pytest.importorskip("tiktoken")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared'))
+
+from utils.chunking import TokenAwareChunker  # noqa: E402
+
+
+@pytest.fixture
+def chunker() -> TokenAwareChunker:
+    """Chunker whose tokenizer splits text into single-byte tokens"""
+    encoding = tiktoken.Encoding(
+        name="bytes",
+        pat_str=r"\s?\S+|\s+",
+        mergeable_ranks={bytes([value]): value for value in range(256)},
+        special_tokens={}
+    )
+    instance = TokenAwareChunker.__new__(TokenAwareChunker)
+    instance.tokenizer = encoding
+    return instance
+
+
+@pytest.mark.parametrize("text", ["Ein schöner Tag für naïve Cafés über Zürich", "東京の天気は晴れです"])
+def test_overlap_never_starts_mid_character_or_mid_word(chunker, text):
+    token_ids = chunker.tokenizer.encode(text)
+    spaced = " " in text
+
+    for overlap_tokens in range(1, len(token_ids) + 1):
+        overlap_text, overlap_ids = chunker._get_overlap_text([token_ids], overlap_tokens)
+
+        assert "�" not in overlap_text
+        assert len(overlap_ids) <= overlap_tokens
+        assert text.endswith(overlap_text)
+        if spaced and overlap_text and overlap_text != text:
+            # Whole words only: the overlap follows a space in the original text
+            assert text[-len(overlap_text) - 1] == " "
+
+
+def test_overlap_keeps_whole_leading_piece(chunker):
+    pieces = [chunker.tokenizer.encode("Grüße."), chunker.tokenizer.encode("Danke schön.")]
+    total = sum(len(ids) for ids in pieces) + 1  # The single-byte space between the pieces
+
+    overlap_text, overlap_ids = chunker._get_overlap_text(pieces, total)
+
+    assert overlap_text == "Grüße. Danke schön."
+    assert len(overlap_ids) == total
+
+    # One token short of the whole text: never cut into the leading word
+    overlap_text, _ = chunker._get_overlap_text(pieces, total - 1)
+
+    assert overlap_text == "Danke schön."
+
+
+def test_chunk_overlap_spanning_sentences_matches_chunk_text(chunker):
+    text = "Alpha beta gamma. Delta epsilon zeta. Eta theta iota. Kappa lambda mu."
+
+    chunks = chunker.chunk_text(text, max_tokens=40, overlap_tokens=25)
+
+    assert chunks == [
+        "Alpha beta gamma Delta epsilon zeta",
+        "gamma Delta epsilon zeta Eta theta iota",
+        "zeta Eta theta iota Kappa lambda mu",
+    ]
+    assert all(len(chunker.tokenizer.encode(chunk)) <= 40 for chunk in chunks)